@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+T(YTTP)ER Batch Mode
+====================
+
+Processes a file of YouTube URLs without the GUI.
+
+Each video goes through four pipelined stages - fetch, split, generate and
+export - connected by bounded queues, so the transcript of the next video is
+downloaded while the chunks of the current one are being generated.
+
+Usage:
+    python batch.py urls.txt [--output-dir DIR] [--format docx|txt] [--queue-size N]
+
+The URL file holds one URL per line; blank lines and lines starting with
+'#' are ignored. Settings (model, prompt, chunking, concurrency) are read
+from config.json exactly as the GUI does.
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+from function import Config, TranscriptHandler
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+
+class BatchItem:
+    """State of one URL as it moves through the pipeline."""
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.video_id = None
+        self.job = None
+        self.failed_chunks = 0
+        self.output_path = None
+        self.error = None
+
+
+class BatchRunner:
+    """Runs a list of URLs through the fetch/split/generate/export stages."""
+
+    STAGES = ("fetch", "split", "generate", "export")
+
+    def __init__(self, handler, output_dir, output_format="docx", queue_size=2, log=print):
+        self.handler = handler
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format
+        self.queue_size = max(1, queue_size)
+        self.log = log
+        self._log_lock = threading.Lock()
+        # Video IDs between fetch and the end of export
+        self._active = set()
+        self._active_changed = threading.Condition()
+
+    def run(self, urls):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        items = [BatchItem(i, url) for i, url in enumerate(urls)]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.STAGES]
+
+        workers = {
+            "fetch": self.fetch,
+            "split": self.split,
+            "generate": self.generate,
+            "export": self.export,
+        }
+        threads = []
+        for i, name in enumerate(self.STAGES):
+            in_q = queues[i]
+            out_q = queues[i + 1] if i + 1 < len(queues) else None
+            thread = threading.Thread(
+                target=self._stage, args=(name, workers[name], in_q, out_q), name=f"batch-{name}", daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+
+        # Feeding the first queue blocks once the pipeline is queue_size videos ahead
+        for item in items:
+            queues[0].put(item)
+        queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        return items
+
+    def _stage(self, name, work, in_q, out_q):
+        while True:
+            item = in_q.get()
+            if item is _DONE:
+                if out_q is not None:
+                    out_q.put(_DONE)
+                return
+            if item.error is None:
+                try:
+                    work(item)
+                except Exception as e:
+                    item.error = str(e)
+                    self._log(item, f"{name} failed: {e}")
+            if out_q is not None:
+                out_q.put(item)
+            else:
+                self._release(item)
+
+    def _log(self, item, message):
+        label = item.job.video_id if item.job else item.url
+        with self._log_lock:
+            self.log(f"[{item.index + 1}] {label}: {message}")
+
+    def _claim(self, video_id):
+        # A repeated URL waits for the earlier item to be exported: both jobs
+        # would share the video's checkpoint and staging directory
+        with self._active_changed:
+            self._active_changed.wait_for(lambda: video_id not in self._active)
+            self._active.add(video_id)
+
+    def _release(self, item):
+        with self._active_changed:
+            self._active.discard(item.video_id)
+            self._active_changed.notify_all()
+
+    def fetch(self, item):
+        video_id = self.handler.parse_video_id(item.url)
+        self._claim(video_id)
+        item.video_id = video_id
+        item.job = self.handler.extract_transcript(item.url)
+        # The document is staged in this format while chunks are generated
+        item.job.output_format = self.output_format
+        self._log(item, f"transcript fetched ({item.job.video_title})")
+
+    def split(self, item):
+        chunk_count = self.handler.split_transcript(item.job)
+        self._log(item, f"split into {chunk_count} chunks")
+
+    def generate(self, item):
+        start = time.time()
+        results = self.handler.process_chunks(item.job)
+        item.failed_chunks = sum(1 for result in results if not result.ok)
+        prompt_tokens = sum(result.metrics.get("prompt_eval_count", 0) for result in results)
+        tokens_per_second = item.job.metrics.tokens_per_second()
+        self._log(item, f"generated {len(results)} chunks in {time.time() - start:.1f}s"
+                        + f" ({prompt_tokens} prompt tokens evaluated"
+                        + (f", {tokens_per_second:.1f} tok/s)" if tokens_per_second else ")")
+                        + (f", {item.failed_chunks} failed" if item.failed_chunks else ""))
+
+    def output_path(self, video_id):
+        # Files are named after the video ID, never the GUI's last filename.
+        # Existing files are kept: a repeat gets a numbered suffix. Only the
+        # export stage calls this, so checking then writing doesn't race.
+        save_path = self.output_dir / f"{video_id}.{self.output_format}"
+        counter = 2
+        while save_path.exists():
+            save_path = self.output_dir / f"{video_id}_{counter}.{self.output_format}"
+            counter += 1
+        return save_path
+
+    def export(self, item):
+        save_path = self.output_path(item.job.video_id)
+        item.output_path = self.handler.write_output(item.job, save_path)
+        if item.job.is_complete():
+            # Failed chunks keep their checkpoint so a later run can resume
+            item.job.discard()
+        self._log(item, f"saved {item.output_path}")
+
+
+def read_urls(path):
+    urls = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process a list of YouTube URLs without the GUI.")
+    parser.add_argument("url_file", help="text file with one YouTube URL per line")
+    parser.add_argument("--output-dir", help="directory for the exported files (default: outputs/)")
+    parser.add_argument("--format", choices=["docx", "txt"], help="output format (default: output_format setting)")
+    parser.add_argument("--queue-size", type=int, default=2, help="videos allowed to wait between stages")
+    args = parser.parse_args(argv)
+
+    config = Config()
+    handler = TranscriptHandler(config)
+    urls = read_urls(args.url_file)
+    if not urls:
+        print("No URLs found.")
+        return 1
+    # Load the model while the first transcript is being fetched
+    handler.warm_up()
+
+    runner = BatchRunner(
+        handler,
+        args.output_dir or config.output_dir,
+        args.format or config.settings.get("output_format", "docx").lower(),
+        queue_size=args.queue_size,
+    )
+    start = time.time()
+    items = runner.run(urls)
+
+    failed = [item for item in items if item.error]
+    print(f"\nProcessed {len(items) - len(failed)}/{len(items)} videos in {time.time() - start:.1f}s")
+    for item in failed:
+        print(f"  {item.url}: {item.error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Offline benchmarks: fake Ollama server, fake transcripts and scenarios.
+# Run with `python -m bench.run` from the repository root.
@@ -0,0 +1,237 @@
+"""
+Stand-in Ollama server for the benchmarks.
+
+Serves /api/generate, /api/chat and /api/tags with the same NDJSON framing
+and final metrics as Ollama. Latency, generation speed, parallelism, cold
+load time and failure rate are configurable, so runs are repeatable without
+a GPU. Replies echo the user text, which keeps overlap merging realistic.
+
+Usage:
+    python -m bench.fake_ollama [--port 11434] [--tokens-per-sec 300] [--latency 0.2]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllama:
+    def __init__(
+        self,
+        port=0,
+        tokens_per_sec=300.0,
+        prompt_tokens_per_sec=3000.0,
+        latency=0.05,
+        failure_rate=0.0,
+        load_time=0.0,
+        max_parallel=4,
+        seed=0,
+    ):
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.load_time = load_time
+        self.requests = 0
+        self.failures = 0
+        # Requests beyond max_parallel queue up, like OLLAMA_NUM_PARALLEL
+        self._slots = threading.Semaphore(max(1, max_parallel))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._loaded = set()
+        self._last_system = None
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.failures += 1
+                return True
+            return False
+
+    def _load(self, model):
+        with self._lock:
+            cold = model not in self._loaded
+            self._loaded.add(model)
+        if cold and self.load_time:
+            time.sleep(self.load_time)
+        return int(self.load_time * 1e9) if cold else 0
+
+    def _prompt_tokens(self, system, text):
+        # Mimics Ollama's prefix cache: an unchanged system message is free
+        with self._lock:
+            reused = system is not None and system == self._last_system
+            self._last_system = system
+        tokens = len(text) // 4
+        if system and not reused:
+            tokens += len(system) // 4
+        return max(1, tokens)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_chunk(self, payload):
+                data = (json.dumps(payload) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": name} for name in sorted(server._loaded)]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                chat = self.path == "/api/chat"
+                if self.path not in ("/api/generate", "/api/chat"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+                if server._should_fail():
+                    self._send_json(503, {"error": "server busy"})
+                    return
+
+                model = request.get("model", "")
+                if chat:
+                    messages = request.get("messages") or []
+                    system = next((m["content"] for m in messages if m.get("role") == "system"), None)
+                    text = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+                else:
+                    system = request.get("system")
+                    text = request.get("prompt")
+                    if text is None:
+                        # Empty generate request: load the model and return
+                        load_ns = server._load(model)
+                        self._send_json(200, {"model": model, "done": True, "done_reason": "load", "load_duration": load_ns})
+                        return
+
+                with server._slots:
+                    self._generate(request, model, system, text, chat)
+
+            def _generate(self, request, model, system, text, chat):
+                started = time.monotonic()
+                load_ns = server._load(model)
+                prompt_tokens = server._prompt_tokens(system, text)
+                prompt_seconds = server.latency + prompt_tokens / server.prompt_tokens_per_sec
+                time.sleep(prompt_seconds)
+
+                words = text.split()
+                tokens = [word + " " for word in words] or [""]
+                # Tokens go out in ~10 ms batches so high rates stay accurate
+                per_tick = max(1, int(server.tokens_per_sec * 0.01))
+                eval_started = time.monotonic()
+                stream = request.get("stream", True)
+                if stream:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                try:
+                    for start in range(0, len(tokens), per_tick):
+                        batch = tokens[start:start + per_tick]
+                        target = eval_started + (start + len(batch)) / server.tokens_per_sec
+                        delay = target - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        if stream:
+                            for token in batch:
+                                if chat:
+                                    self._send_chunk({"model": model, "message": {"role": "assistant", "content": token}, "done": False})
+                                else:
+                                    self._send_chunk({"model": model, "response": token, "done": False})
+                    final = {
+                        "model": model,
+                        "done": True,
+                        "total_duration": int((time.monotonic() - started) * 1e9),
+                        "load_duration": load_ns,
+                        "prompt_eval_count": prompt_tokens,
+                        "prompt_eval_duration": int(prompt_seconds * 1e9),
+                        "eval_count": len(tokens),
+                        "eval_duration": int((time.monotonic() - eval_started) * 1e9),
+                    }
+                    if stream:
+                        self._send_chunk(final)
+                        self.wfile.write(b"0\r\n\r\n")
+                    else:
+                        reply = "".join(tokens).strip()
+                        if chat:
+                            final["message"] = {"role": "assistant", "content": reply}
+                        else:
+                            final["response"] = reply
+                        self._send_json(200, final)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled; Ollama would stop generating here too
+                    pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server for offline testing.")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--tokens-per-sec", type=float, default=300.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--load-time", type=float, default=0.0, help="cold model load time in seconds")
+    parser.add_argument("--max-parallel", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    server = FakeOllama(
+        port=args.port,
+        tokens_per_sec=args.tokens_per_sec,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        load_time=args.load_time,
+        max_parallel=args.max_parallel,
+    )
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Deterministic transcript and title stand-ins for the benchmarks.
+
+FakeTranscriptProvider has the same call shape as
+YouTubeTranscriptApi.get_transcript and is passed to TranscriptHandler as
+transcript_provider. Videos are registered by ID with a length in minutes.
+Captions come at a realistic speaking rate: short entries covering a few
+seconds each, with sentences running across entry boundaries.
+"""
+
+import random
+
+from youtube_transcript_api import VideoUnavailable
+
+WORDS = (
+    "the model reads each chunk of the transcript and rewrites it with proper grammar "
+    "punctuation and paragraphs so that spoken language turns into readable text while "
+    "keeping every point the speaker made about performance memory latency and design"
+).split()
+
+
+class FakeTranscriptProvider:
+    def __init__(self, videos=None, words_per_minute=150, seed=0):
+        self.videos = dict(videos or {})
+        self.words_per_minute = words_per_minute
+        self.seed = seed
+        self.calls = 0
+
+    def add_video(self, video_id, minutes):
+        self.videos[video_id] = minutes
+
+    def __call__(self, video_id, *args, **kwargs):
+        self.calls += 1
+        if video_id not in self.videos:
+            raise VideoUnavailable(video_id)
+        return self.entries(video_id, self.videos[video_id])
+
+    def entries(self, video_id, minutes):
+        rng = random.Random(f"{self.seed}:{video_id}")
+        total_words = int(minutes * self.words_per_minute)
+        seconds_per_word = 60.0 / self.words_per_minute
+        entries = []
+        words = []
+        sentence_left = rng.randint(8, 20)
+        for i in range(total_words):
+            word = rng.choice(WORDS)
+            sentence_left -= 1
+            if sentence_left == 0:
+                word += "."
+                sentence_left = rng.randint(8, 20)
+            words.append(word)
+            # Caption entries hold 6-10 words, like auto-generated captions
+            if len(words) >= rng.randint(6, 10) or i == total_words - 1:
+                start = (i + 1 - len(words)) * seconds_per_word
+                entries.append({"text": " ".join(words), "start": round(start, 2), "duration": round(len(words) * seconds_per_word, 2)})
+                words = []
+        return entries
+
+
+def fake_title(video_id):
+    return f"Benchmark video {video_id}"
@@ -0,0 +1,253 @@
+"""
+T(YTTP)ER Benchmarks
+====================
+
+Runs the whole pipeline offline against FakeOllama and
+FakeTranscriptProvider: transcript fetch, split_transcript, generation
+through ProcessingWorker (or TranscriptHandler.process_chunks directly with
+--driver handler) and combine_chunks_to_output. Nothing touches YouTube or
+a real model, so results depend only on the code under test.
+
+Usage:
+    python -m bench.run [SCENARIO ...] [--repeat N] [--driver worker|handler]
+                        [--save results.json] [--compare baseline.json] [--threshold 0.15]
+
+Run it from the repository root. Each scenario runs in a fresh process so
+peak RSS is measured per scenario. --compare exits with status 1 when wall
+time, p95 latency or peak RSS regress by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from types import SimpleNamespace
+
+from bench.fake_ollama import FakeOllama
+from bench.fake_transcripts import FakeTranscriptProvider, fake_title
+from bench.scenarios import BASE_SERVER, BASE_SETTINGS, get_scenarios
+
+VIDEO_ID = "benchvideo1"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COMPARED = ("wall_s", "p95_ms", "peak_rss_mb")
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(values))))
+    return values[min(rank, len(values)) - 1]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_worker(handler, config, url):
+    # Drives ProcessingWorker the way the GUI does, minus the window: run()
+    # executes on this thread and a second thread drains the text buffer
+    # once per frame like ProcessingScreen.render_frame.
+    import process
+
+    screen = SimpleNamespace(job=None, video_id="", video_title="")
+    parent = SimpleNamespace(handler=handler, config=config, processing_screen=screen)
+    worker = process.ProcessingWorker(parent, url)
+    statuses = []
+    worker.update_status.connect(lambda message, color: statuses.append(message))
+
+    stop = threading.Event()
+
+    def drain():
+        while not stop.is_set():
+            worker.text_buffer.drain()
+            stop.wait(0.016)
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+    try:
+        worker.run()
+    finally:
+        stop.set()
+        drainer.join()
+    if screen.job is None or statuses and statuses[-1].startswith("Error"):
+        raise RuntimeError(statuses[-1] if statuses else "Worker produced no job")
+    return screen.job
+
+
+def run_handler(handler, url):
+    job = handler.extract_transcript(url)
+    handler.split_transcript(job)
+    handler.process_chunks(job)
+    return job
+
+
+def run_scenario(scenario, driver="worker"):
+    from function import Config, TranscriptHandler
+
+    server_params = {**BASE_SERVER, **scenario.get("server", {})}
+    with ExitStack() as stack:
+        base_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="tyttper-bench-"))
+        servers = [stack.enter_context(FakeOllama(**server_params)) for _ in range(scenario.get("hosts", 1))]
+        config = Config(base_dir)
+        config.settings.update(BASE_SETTINGS)
+        config.settings.update(scenario.get("settings", {}))
+        config.settings["ollama_host"] = servers[0].url
+        if len(servers) > 1:
+            config.settings["ollama_hosts"] = [server.url for server in servers]
+        provider = FakeTranscriptProvider({VIDEO_ID: scenario["minutes"]})
+        handler = TranscriptHandler(config, transcript_provider=provider, title_provider=fake_title)
+        url = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+        started = time.perf_counter()
+        if driver == "worker":
+            job = run_worker(handler, config, url)
+        else:
+            job = run_handler(handler, url)
+        save_path = Path(base_dir) / f"{VIDEO_ID}.{config.settings['output_format']}"
+        messages = []
+        handler.combine_chunks_to_output(job, save_path, lambda message, color: messages.append(message))
+        wall = time.perf_counter() - started
+        if not save_path.exists():
+            raise RuntimeError(messages[-1] if messages else "No output written")
+
+        chunks = list(job.metrics.chunks.values())
+        latencies = sorted(result.duration * 1000 for result in chunks if result.ok)
+        stages = job.metrics.stages
+        result = {
+            "scenario": scenario["name"],
+            "driver": driver,
+            "minutes": scenario["minutes"],
+            "chunks": len(chunks),
+            "failed": sum(1 for chunk in chunks if not chunk.ok),
+            "retried": sum(1 for chunk in chunks if chunk.attempts > 1),
+            "wall_s": round(wall, 3),
+            "chunks_per_s": round(len(chunks) / wall, 2) if wall else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "split_ms": round(stages.get("split", 0) * 1000, 1),
+            "generate_s": round(stages.get("generate", 0), 3),
+            "export_ms": round(stages.get("export", 0) * 1000, 1),
+            "output_kb": round(save_path.stat().st_size / 1024, 1),
+            "server_requests": sum(server.requests for server in servers),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        config.flush()
+        config.history.close()
+        return result
+
+
+def run_isolated(scenario, driver):
+    # A fresh interpreter per run keeps peak RSS and caches independent
+    completed = subprocess.run(
+        [sys.executable, "-m", "bench.run", scenario["name"], "--driver", driver, "--child"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{scenario['name']} failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_child(scenario, driver):
+    print(json.dumps(run_scenario(scenario, driver)))
+    sys.stdout.flush()
+    # Skips interpreter teardown, which some PySide6 builds crash in after a
+    # QThread emitted signals without a running event loop
+    os._exit(0)
+
+
+def print_table(results):
+    columns = [
+        ("scenario", "scenario", "{}"),
+        ("chunks", "chunks", "{}"),
+        ("failed", "failed", "{}"),
+        ("wall_s", "wall s", "{:.2f}"),
+        ("chunks_per_s", "chunks/s", "{:.2f}"),
+        ("p50_ms", "p50 ms", "{:.0f}"),
+        ("p95_ms", "p95 ms", "{:.0f}"),
+        ("split_ms", "split ms", "{:.1f}"),
+        ("export_ms", "export ms", "{:.1f}"),
+        ("peak_rss_mb", "peak RSS MB", "{}"),
+    ]
+    rows = [[fmt.format(result[key]) for key, _, fmt in columns] for result in results]
+    headers = [title for _, title, _ in columns]
+    widths = [max(len(cell) for cell in column) for column in zip(headers, *rows)]
+    print("  ".join(title.ljust(width) for title, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for result in results:
+        before = baseline.get(result["scenario"])
+        if not before:
+            continue
+        for key in COMPARED:
+            old, new = before.get(key), result.get(key)
+            if old and new and new > old * (1 + threshold):
+                regressions.append(f"{result['scenario']}: {key} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the processing pipeline offline.")
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario; the median run is reported")
+    parser.add_argument("--driver", choices=["worker", "handler"], default="worker",
+                        help="generate through ProcessingWorker (needs PySide6) or TranscriptHandler directly")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier --save")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = get_scenarios(args.scenarios)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.child:
+        run_child(scenarios[0], args.driver)
+
+    results = []
+    for scenario in scenarios:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            runs.append(run_isolated(scenario, args.driver))
+        runs.sort(key=lambda run: run["wall_s"])
+        result = runs[len(runs) // 2]
+        results.append(result)
+        print(f"{scenario['name']}: {result['chunks']} chunks in {result['wall_s']:.2f}s", file=sys.stderr)
+
+    print_table(results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({result["scenario"]: result for result in results}, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Benchmark scenarios.
+
+Each scenario names a video length and the settings and fake server
+parameters that differ from the defaults below; "hosts" starts several
+fake servers and spreads chunks over them. Keep names stable: saved
+results are compared by name.
+"""
+
+# Settings applied to every scenario on top of Config defaults
+BASE_SETTINGS = {
+    "ollama_model": "bench-model",
+    "response_cache_enabled": False,
+    "warm_up_model": False,
+    "resume_jobs": False,
+    "output_format": "txt",
+}
+
+# FakeOllama parameters applied to every scenario
+BASE_SERVER = {
+    "tokens_per_sec": 400.0,
+    "latency": 0.05,
+    "max_parallel": 4,
+}
+
+SCENARIOS = [
+    {"name": "short", "minutes": 5},
+    {"name": "long", "minutes": 60},
+    {"name": "long-words-300", "minutes": 60, "settings": {"chunk_mode": "words", "chunk_size": 300}},
+    {"name": "long-words-700", "minutes": 60, "settings": {"chunk_mode": "words", "chunk_size": 700}},
+    {"name": "long-serial", "minutes": 60, "settings": {"max_concurrent_chunks": 1}},
+    {"name": "long-parallel-4", "minutes": 60, "settings": {"max_concurrent_chunks": 4}},
+    {"name": "long-3-hosts", "minutes": 60, "hosts": 3},
+    {"name": "long-docx", "minutes": 60, "settings": {"output_format": "docx"}},
+    {"name": "flaky", "minutes": 20, "server": {"failure_rate": 0.1}},
+    {"name": "marathon", "minutes": 180, "settings": {"max_concurrent_chunks": 4}, "server": {"tokens_per_sec": 2000.0}},
+]
+
+
+def get_scenarios(names=None):
+    if not names:
+        return list(SCENARIOS)
+    by_name = {scenario["name"]: scenario for scenario in SCENARIOS}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(unknown)}")
+    return [by_name[name] for name in names]
@@ -1,12 +1,26 @@
 # functions.py
+#
+# Processing core: transcript fetch, chunking, generation and export.
+# Deliberately free of Qt so it can run from scripts, servers and tests.
 
 import os
 import json
+import atexit
 import time
+import hashlib
+import sqlite3
 import requests
 import re
+import html
+import shutil
+import random
+from difflib import SequenceMatcher
+import threading
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from PySide6.QtWidgets import QFileDialog
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 from youtube_transcript_api import (
     YouTubeTranscriptApi,
     NoTranscriptFound,
@@ -29,75 +43,1257 @@ def read_file_with_fallback(filepath):
     raise UnicodeDecodeError(f"Could not decode file {filepath} with available encodings.")
 
 
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+
+# A word ends a sentence when it ends in . ! ? (optionally followed by quotes/brackets)
+SENTENCE_END = re.compile(r"[.!?\u2026][\"')\]]*$")
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English BPE vocabularies
+    return max(1, (len(text) + 3) // 4)
+
+
+# -------------------------
+# Overlap Merge
+# -------------------------
+def _norm_word(word):
+    return re.sub(r"\W+", "", word).lower()
+
+
+def find_overlap(prev_text, next_text, overlap_words):
+    # Aligns the tail of prev_text with the head of next_text, which repeat
+    # the overlap_words shared by neighbouring chunks, possibly reworded by
+    # the model. Returns (prev_end, next_start) character offsets so that
+    # prev_text[:prev_end] + next_text[next_start:] keeps the shared passage
+    # once, or None when no convincing overlap is found.
+    if overlap_words <= 0:
+        return None
+    # Room for the model rewording the overlap, and for stray words before
+    # the end of prev_text or after the start of next_text
+    window_words = max(20, overlap_words * 2)
+    slack = max(5, overlap_words // 4)
+    min_match = max(4, overlap_words // 4)
+
+    prev_words = list(re.finditer(r"\S+", prev_text))[-window_words:]
+    next_words = []
+    for match in re.finditer(r"\S+", next_text):
+        next_words.append(match)
+        if len(next_words) >= window_words:
+            break
+    if not prev_words or not next_words:
+        return None
+
+    matcher = SequenceMatcher(
+        None,
+        [_norm_word(m.group()) for m in prev_words],
+        [_norm_word(m.group()) for m in next_words],
+        autojunk=False,
+    )
+    # Single matching words are mostly "the", "and" etc.; an overlap shows
+    # up as runs of at least two words, in order on both sides
+    blocks = [block for block in matcher.get_matching_blocks() if block.size >= 2]
+    if not blocks:
+        return None
+    first, last = blocks[0], blocks[-1]
+    matched = sum(block.size for block in blocks)
+    prev_span = last.a + last.size - first.a
+    if (
+        matched < min_match
+        # The shared passage must run up to the end of prev_text...
+        or len(prev_words) - (last.a + last.size) > slack
+        # ...and start at the beginning of next_text
+        or first.b > slack
+        # and be mostly matching words, not a phrase that recurs by chance
+        or matched < prev_span / 2
+    ):
+        return None
+    return prev_words[last.a + last.size - 1].end(), next_words[last.b + last.size - 1].end()
+
+
+# -------------------------
+# Shared HTTP Client
+# -------------------------
+class HttpClient:
+    def __init__(self, pool_size=10, max_per_host=8):
+        # Keep-alive session: pool_size hosts are cached, each with at most
+        # max_per_host connections. Extra requests wait for a free connection.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=max_per_host, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+# -------------------------
+# Cancellation
+# -------------------------
+class CancelEvent(threading.Event):
+    # A threading.Event that also aborts the HTTP responses tracked under it:
+    # the blocked read wakes up at once and, as the connection is then closed,
+    # Ollama sees the client go away and stops generating.
+    def __init__(self):
+        super().__init__()
+        self._responses_lock = threading.Lock()
+        self._responses = set()
+
+    def set(self):
+        super().set()
+        with self._responses_lock:
+            responses = list(self._responses)
+        for response in responses:
+            abort_response(response)
+
+    @contextmanager
+    def track(self, response):
+        with self._responses_lock:
+            self._responses.add(response)
+        try:
+            if self.is_set():
+                abort_response(response)
+            yield response
+        finally:
+            with self._responses_lock:
+                self._responses.discard(response)
+
+
+def abort_response(response):
+    # Shuts down the read side of the socket so a read blocked in another
+    # thread returns immediately; that thread then closes the response.
+    try:
+        response.raw.shutdown()
+    except Exception:
+        response.close()
+
+
 # -------------------------
 # Ollama API Helper Function
 # -------------------------
-def generate_response(prompt, model, host="http://localhost:11434", cancel_event=None):
-    url = f"{host}/api/generate"
-    payload = {"model": model, "prompt": prompt, "stream": False}
-    headers = {"Content-Type": "application/json"}
+class GenerationError(RuntimeError):
+    # transient marks failures worth retrying: timeouts, dropped connections,
+    # server overload. Anything else (unknown model, bad request) is final.
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+        self.attempts = 0
+
+
+class GenerationTimeout(GenerationError):
+    def __init__(self, message):
+        super().__init__(message, transient=True)
+
+
+class HostUnavailable(GenerationError):
+    # The host refused or dropped the connection; another host may do better
+    def __init__(self, message):
+        super().__init__(message, transient=True)
+
+
+class GenerationCancelled(GenerationError):
+    def __init__(self):
+        super().__init__("Generation cancelled")
+
+
+class RetryNotice(str):
+    # Sent through on_token when an attempt is abandoned: the tokens streamed
+    # for the chunk so far are void and the next attempt starts over. The
+    # string says why.
+    pass
+
+
+def keep_alive_value(value):
+    # Ollama takes a duration string ("30m") or a number of seconds (-1 keeps
+    # the model loaded indefinitely); settings may hold either form.
+    value = str(value).strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value or None
+
+
+def load_model(model, host=None, keep_alive=None, client=None, timeout=300, options=None):
+    # An empty request makes Ollama load the model and hold it for keep_alive.
+    # options must match what generation sends: a different num_ctx makes
+    # Ollama load the model again on the first real request.
+    client = client or get_http_client()
+    url = f"{(host or DEFAULT_OLLAMA_HOST).rstrip('/')}/api/generate"
+    payload = {"model": model, "stream": False}
+    if options:
+        payload["options"] = options
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
     try:
-        if cancel_event and cancel_event.is_set():
-            return "[Generation cancelled]", None
-        response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
-        if cancel_event and cancel_event.is_set():
-            return "[Generation cancelled]", None
+        response = client.post(url, json=payload, timeout=(10, timeout))
         response.raise_for_status()
-        try:
-            json_response = response.json()
-        except JSONDecodeError:
-            # Retry once if empty response
-            time.sleep(1)
-            response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
+        return True
+    except requests.RequestException as e:
+        print(f"Could not preload model {model}: {e}")
+        return False
+
+
+def _set_read_timeout(response, seconds):
+    # Changes the socket timeout of a response that is already streaming
+    try:
+        response.raw.connection.sock.settimeout(seconds)
+    except (AttributeError, OSError):
+        pass
+
+
+def stream_response(
+    prompt,
+    model,
+    host=None,
+    cancel_event=None,
+    client=None,
+    options=None,
+    timeout=30,
+    keep_alive=None,
+    system=None,
+    stall_timeout=None,
+):
+    # Yields each NDJSON object as Ollama produces it; the last one has done=True
+    # and carries the eval/prompt_eval metrics. timeout bounds the wait for
+    # the first token (queueing, model load, prompt evaluation). After that a
+    # response may run as long as it keeps streaming: stall_timeout (default
+    # timeout) only bounds the gap between two tokens. With a system message
+    # the request goes to /api/chat: a fixed system message keeps the start of
+    # the prompt byte-identical between requests, so Ollama can reuse its KV
+    # cache for it and only evaluates the new user message.
+    client = client or get_http_client()
+    base_url = (host or DEFAULT_OLLAMA_HOST).rstrip("/")
+    if system is not None:
+        url = f"{base_url}/api/chat"
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+        payload = {"model": model, "messages": messages, "stream": True}
+    else:
+        url = f"{base_url}/api/generate"
+        payload = {"model": model, "prompt": prompt, "stream": True}
+    if options:
+        payload["options"] = options
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    headers = {"Content-Type": "application/json"}
+    started = False
+    with client.post(url, headers=headers, data=json.dumps(payload), timeout=(10, timeout), stream=True) as response:
+        tracked = cancel_event.track(response) if isinstance(cancel_event, CancelEvent) else nullcontext()
+        with tracked:
+            if not response.ok:
+                # Ollama explains the failure (e.g. an unknown model) in the body
+                try:
+                    reason = response.json().get("error")
+                except ValueError:
+                    reason = None
+                if reason:
+                    raise requests.HTTPError(f"{response.status_code} {reason}", response=response)
             response.raise_for_status()
-            json_response = response.json()
-        generated_text = json_response.get("response", "").strip()
-        return generated_text, json_response
+            try:
+                for line in response.iter_lines():
+                    if cancel_event and cancel_event.is_set():
+                        return
+                    if not line:
+                        continue
+                    if not started:
+                        started = True
+                        if stall_timeout is not None:
+                            _set_read_timeout(response, stall_timeout)
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(data["error"])
+                    yield data
+                    if data.get("done"):
+                        return
+            except requests.ConnectionError as e:
+                # requests reports a read timeout mid-body as a connection error
+                if not any(isinstance(arg, ReadTimeoutError) for arg in e.args):
+                    raise
+                if started:
+                    raise GenerationTimeout(f"No new tokens for {stall_timeout or timeout:.0f}s")
+                raise GenerationTimeout(f"No response within {timeout:.0f}s")
+
+
+def generate(
+    prompt,
+    model,
+    host=None,
+    cancel_event=None,
+    on_token=None,
+    client=None,
+    options=None,
+    timeout=30,
+    keep_alive=None,
+    system=None,
+    stall_timeout=None,
+):
+    # Returns (text, final_json). Requests are always streamed from Ollama, so
+    # a cancelled request can drop its connection mid-generation; on_token, if
+    # given, receives the tokens. Failures raise GenerationError.
+    pieces = []
+    json_response = None
+    if cancel_event and cancel_event.is_set():
+        raise GenerationCancelled()
+    try:
+        for data in stream_response(
+            prompt, model, host, cancel_event, client, options, timeout, keep_alive, system, stall_timeout
+        ):
+            token = data.get("response") or data.get("message", {}).get("content", "")
+            if token:
+                # Leading whitespace is dropped to match the stripped full text
+                if not pieces:
+                    token = token.lstrip()
+                if token:
+                    pieces.append(token)
+                    if on_token is not None:
+                        on_token(token)
+            json_response = data
+    except GenerationError:
+        raise
+    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+        if not (cancel_event and cancel_event.is_set()):
+            raise HostUnavailable(str(e))
+    except requests.Timeout as e:
+        if not (cancel_event and cancel_event.is_set()):
+            raise GenerationTimeout(str(e))
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else 0
+        if not (cancel_event and cancel_event.is_set()):
+            raise GenerationError(str(e), transient=status >= 500 or status == 429)
+    except (requests.RequestException, JSONDecodeError) as e:
+        if not (cancel_event and cancel_event.is_set()):
+            raise GenerationError(str(e), transient=True)
     except Exception as e:
-        msg = str(e)
-        if "no element found" in msg:
-            return "[Unable to fetch transcript or response is empty]", None
-        return f"[Error processing chunk: {e}]", None
+        if not (cancel_event and cancel_event.is_set()):
+            raise GenerationError(str(e))
+    if cancel_event and cancel_event.is_set():
+        raise GenerationCancelled()
+    if json_response is None or not json_response.get("done"):
+        raise GenerationError("Response ended before generation finished", transient=True)
+    return "".join(pieces).strip(), json_response
+
+
+class ThroughputMeter:
+    # Moving averages of the generation and prompt-evaluation speed Ollama
+    # reports with each finished response, and of how many tokens it writes
+    # per input token, used to size request timeouts.
+    # Until measured, a rewrite is assumed to run a little longer than its input
+    DEFAULT_OUTPUT_RATIO = 1.5
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.eval_rate = None
+        self.prompt_rate = None
+        self.output_ratio = None
+        self._lock = threading.Lock()
+
+    def _average(self, current, value):
+        return value if current is None else current + self.alpha * (value - current)
+
+    def _update(self, current, count, duration_ns):
+        if not count or not duration_ns:
+            return current
+        return self._average(current, count / (duration_ns / 1e9))
+
+    def record(self, json_response, input_tokens=None):
+        # input_tokens: estimated size of the text the response rewrote. Long
+        # reasoning output (e.g. deepseek-r1) shows up as a high ratio.
+        with self._lock:
+            self.eval_rate = self._update(
+                self.eval_rate, json_response.get("eval_count"), json_response.get("eval_duration")
+            )
+            self.prompt_rate = self._update(
+                self.prompt_rate, json_response.get("prompt_eval_count"), json_response.get("prompt_eval_duration")
+            )
+            if input_tokens and json_response.get("eval_count"):
+                self.output_ratio = self._average(self.output_ratio, json_response["eval_count"] / input_tokens)
+
+    def estimate(self, prompt_tokens, input_tokens):
+        # Expected seconds for a request, or None until a response was measured
+        with self._lock:
+            if not self.eval_rate:
+                return None
+            output_tokens = input_tokens * (self.output_ratio or self.DEFAULT_OUTPUT_RATIO)
+            seconds = output_tokens / self.eval_rate
+            if self.prompt_rate:
+                seconds += prompt_tokens / self.prompt_rate
+            return seconds
+
+
+# -------------------------
+# Ollama Hosts
+# -------------------------
+def _model_name(name):
+    # Ollama lists "llama3:latest" for a model requested as "llama3"
+    return name if ":" in name else f"{name}:latest"
+
+
+class OllamaHost:
+    def __init__(self, url):
+        self.url = url
+        self.healthy = True
+        self.models = None  # model names from the last probe; None = unknown
+        self.outstanding = 0
+        self.completed = 0
+        self.failures = 0
+        self.last_error = ""
+
+    def serves(self, model):
+        return self.models is None or _model_name(model) in self.models
+
+
+class HostPool:
+    # Spreads requests over several Ollama servers: each request goes to the
+    # healthy host with the fewest requests outstanding that has the model.
+    # A background thread probes /api/tags to notice hosts going down,
+    # coming back, or gaining and losing models.
+    def __init__(self, urls, client=None, probe_interval=30):
+        self.urls = list(urls)
+        self.hosts = [OllamaHost(url.rstrip("/")) for url in self.urls]
+        self.client = client or get_http_client()
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def start(self):
+        # A single host has nothing to fail over to, so it isn't probed
+        if len(self.hosts) > 1 and self._thread is None:
+            self._thread = threading.Thread(target=self._probe_loop, name="tyttper-probe", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.probe_interval)
+
+    def probe_all(self):
+        for host in self.hosts:
+            self.probe(host)
+
+    def probe(self, host):
+        try:
+            response = self.client.get(f"{host.url}/api/tags", timeout=(3, 5))
+            response.raise_for_status()
+            models = {_model_name(model.get("name", "")) for model in response.json().get("models", [])}
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                host.healthy = False
+                host.last_error = str(e)
+            return False
+        with self._lock:
+            host.healthy = True
+            host.models = models
+        return True
+
+    def acquire(self, model, exclude=()):
+        # Picks and reserves a host. Falls back to unhealthy or excluded hosts
+        # rather than failing outright, as a probe may simply be out of date.
+        with self._lock:
+            candidates = [host for host in self.hosts if host.healthy and host.serves(model) and host not in exclude]
+            if not candidates:
+                candidates = [host for host in self.hosts if host.healthy and host not in exclude]
+            if not candidates:
+                candidates = [host for host in self.hosts if host not in exclude] or self.hosts
+            host = min(candidates, key=lambda host: (host.outstanding, host.failures))
+            host.outstanding += 1
+            return host
+
+    def release(self, host, error=None):
+        with self._lock:
+            host.outstanding -= 1
+            if error is None:
+                host.completed += 1
+                host.healthy = True
+                return
+            host.failures += 1
+            host.last_error = str(error)
+            if isinstance(error, HostUnavailable):
+                # Out of rotation until a probe finds it answering again
+                host.healthy = False
+
+    def healthy_count(self):
+        with self._lock:
+            return sum(1 for host in self.hosts if host.healthy)
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "url": host.url,
+                    "healthy": host.healthy,
+                    "outstanding": host.outstanding,
+                    "completed": host.completed,
+                    "failures": host.failures,
+                }
+                for host in self.hosts
+            ]
+
+
+# -------------------------
+# Response Cache
+# -------------------------
+class ResponseCache:
+    def __init__(self, cache_dir, max_bytes):
+        # One JSON file per response; the file mtime is the LRU timestamp.
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.cache_dir.glob("*.json"))
+
+    @staticmethod
+    def make_key(model, prompt, chunk_text, options=None):
+        blob = json.dumps(
+            {"model": model, "prompt": prompt, "chunk": chunk_text, "options": options or {}},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["response"]
+            os.utime(path)
+        except (OSError, JSONDecodeError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key, text):
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"response": text, "created": time.time()}, f, ensure_ascii=False)
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._size += path.stat().st_size - old_size
+                if self._size > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            print(f"Error writing response cache: {e}")
+
+    def _evict(self):
+        entries = []
+        for f in self.cache_dir.glob("*.json"):
+            try:
+                stat = f.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, f))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        # Drop least recently used entries down to 90% of the cap so the
+        # directory is not rescanned on every following write
+        target = self.max_bytes * 0.9
+        for _, size, f in entries:
+            if self._size <= target:
+                break
+            try:
+                f.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self._size}
+
+    def clear(self):
+        with self._lock:
+            for f in self.cache_dir.glob("*.json"):
+                f.unlink(missing_ok=True)
+            self._size = 0
+
+
+# -------------------------
+# Transcript Cache
+# -------------------------
+class TranscriptCache:
+    def __init__(self, cache_dir, ttl_seconds, negative_ttl_seconds):
+        # A TTL of 0 disables that kind of entry
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+    def _path(self, video_id):
+        return self.cache_dir / f"{video_id}.json"
+
+    def get(self, video_id):
+        try:
+            with open(self._path(video_id), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, JSONDecodeError):
+            return None
+        ttl = self.negative_ttl_seconds if "error" in record else self.ttl_seconds
+        if time.time() - record.get("fetched_at", 0) > ttl:
+            return None
+        return record
+
+    def put(self, video_id, entries):
+        if self.ttl_seconds > 0:
+            self._write(video_id, {"fetched_at": time.time(), "entries": list(entries)})
+
+    def put_unavailable(self, video_id, reason):
+        if self.negative_ttl_seconds > 0:
+            self._write(video_id, {"fetched_at": time.time(), "error": reason})
+
+    def _write(self, video_id, record):
+        path = self._path(video_id)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            print(f"Error writing transcript cache: {e}")
+
+    def invalidate(self, video_id):
+        self._path(video_id).unlink(missing_ok=True)
+
+
+class TitleCache:
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self._titles = json.load(f)
+        except (OSError, JSONDecodeError):
+            self._titles = {}
+
+    def get(self, video_id):
+        with self._lock:
+            return self._titles.get(video_id)
+
+    def put(self, video_id, title):
+        with self._lock:
+            self._titles[video_id] = title
+            tmp_path = self.cache_file.with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._titles, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
+            except OSError as e:
+                print(f"Error writing title cache: {e}")
+
+
+# -------------------------
+# History Store
+# -------------------------
+class HistoryStore:
+    def __init__(self, db_path, legacy_file=None):
+        # Newest entries have the highest id; pages are fetched by id so rows
+        # added while a view is open never shift the pages already loaded
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, video_id TEXT NOT NULL, "
+                "url TEXT NOT NULL, title TEXT, date TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_video ON history(video_id)")
+        if legacy_file is not None:
+            self._import_legacy(Path(legacy_file))
+
+    def _import_legacy(self, legacy_file):
+        # One-off migration of the old history.json (newest first)
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, JSONDecodeError):
+            entries = []
+        rows = [
+            (e.get("id", ""), e.get("url", ""), e.get("title", ""), e.get("date", ""))
+            for e in reversed(entries if isinstance(entries, list) else [])
+            if isinstance(e, dict)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO history (video_id, url, title, date) VALUES (?, ?, ?, ?)", rows)
+        legacy_file.replace(legacy_file.with_suffix(".json.migrated"))
+
+    @staticmethod
+    def _entry(row):
+        return {"rowid": row["id"], "id": row["video_id"], "url": row["url"], "title": row["title"], "date": row["date"]}
+
+    def add(self, video_id, url, title=""):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO history (video_id, url, title, date) VALUES (?, ?, ?, ?)",
+                (video_id, url, title, time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            return cursor.lastrowid
+
+    def page(self, before_id=None, limit=100):
+        query = "SELECT * FROM history"
+        params = []
+        if before_id is not None:
+            query += " WHERE id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [self._entry(row) for row in self._conn.execute(query, params)]
+
+    def since(self, after_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM history WHERE id > ? ORDER BY id DESC", (after_id,))
+            return [self._entry(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -------------------------
+# Processing Job
+# -------------------------
+class ChunkResult:
+    # Outcome of one chunk. Only status "done" carries text for the output;
+    # "failed" and "cancelled" carry the error instead.
+    def __init__(self, idx, text=None, status="done", error=None, attempts=0, cached=False, metrics=None, duration=0.0):
+        self.idx = idx
+        self.text = text
+        self.status = status
+        self.error = error
+        self.attempts = attempts
+        self.cached = cached
+        self.duration = duration
+        # Ollama's counters for the request (prompt_eval_count etc.), if any
+        self.metrics = metrics or {}
+
+    @property
+    def ok(self):
+        return self.status == "done"
+
+    @property
+    def display_text(self):
+        if self.ok:
+            return self.text
+        if self.status == "cancelled":
+            return "[Generation cancelled]"
+        return f"[Chunk {self.idx + 1} failed: {self.error}]"
+
+
+class JobMetrics:
+    # Stage timings and per-chunk Ollama counters for one job. Every record is
+    # also appended to log_file as a JSON line, so runs can be compared later.
+    def __init__(self, video_id, log_file=None):
+        self.video_id = video_id
+        self.log_file = Path(log_file) if log_file else None
+        self.stages = {}
+        self.chunks = {}
+        self.generation_started = None
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        if self.log_file is None:
+            return
+        record = {"time": round(time.time(), 3), "video_id": self.video_id, **record}
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Error writing metrics log: {e}")
+
+    def record_stage(self, name, duration, **fields):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + duration
+            self._write({"event": "stage", "stage": name, "duration": round(duration, 3), **fields})
+
+    @contextmanager
+    def stage(self, name, **fields):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.monotonic() - started, **fields)
+
+    def start_generation(self):
+        with self._lock:
+            self.generation_started = time.monotonic()
+
+    def record_chunk(self, result):
+        record = {
+            "event": "chunk",
+            "index": result.idx,
+            "status": result.status,
+            "attempts": result.attempts,
+            "cached": result.cached,
+            "duration": round(result.duration, 3),
+            **result.metrics,
+        }
+        if result.error:
+            record["error"] = result.error
+        with self._lock:
+            self.chunks[result.idx] = result
+            self._write(record)
+
+    def tokens_per_second(self):
+        # Generation speed over the chunks Ollama actually produced
+        with self._lock:
+            results = list(self.chunks.values())
+        count = sum(result.metrics.get("eval_count", 0) for result in results)
+        duration = sum(result.metrics.get("eval_duration", 0) for result in results)
+        return count / (duration / 1e9) if duration else None
+
+    def eta(self, remaining):
+        # Wall-clock seconds for `remaining` chunks at the pace seen so far,
+        # which already reflects how many chunks run concurrently
+        with self._lock:
+            done = len(self.chunks)
+            started = self.generation_started
+        if not done or started is None:
+            return None
+        return (time.monotonic() - started) / done * remaining
+
+    def summary(self):
+        with self._lock:
+            results = list(self.chunks.values())
+            stages = {name: round(duration, 3) for name, duration in self.stages.items()}
+        summary = {
+            "chunks": len(results),
+            "failed": sum(1 for result in results if result.status == "failed"),
+            "cached": sum(1 for result in results if result.cached),
+            "stages": stages,
+        }
+        for key in ("prompt_eval_count", "eval_count", "load_duration", "total_duration"):
+            summary[key] = sum(result.metrics.get(key, 0) for result in results)
+        tokens_per_second = self.tokens_per_second()
+        if tokens_per_second:
+            summary["tokens_per_second"] = round(tokens_per_second, 2)
+        return summary
+
+    def write_summary(self):
+        self._write({"event": "summary", **self.summary()})
+
+
+class Job:
+    def __init__(
+        self, video_id, video_url="", video_title="", spill_dir=None, checkpoint=False, memory_limit=0, metrics=None
+    ):
+        # Carries one video through split -> generate -> export in memory.
+        # Results are written to spill_dir when checkpointing is on, and moved
+        # out of memory entirely once they exceed memory_limit bytes.
+        self.video_id = video_id
+        self.video_url = video_url
+        self.video_title = video_title
+        # Per-job overrides of the ollama_model, processing_prompt and
+        # output_format settings
+        self.model = None
+        self.prompt = None
+        self.output_format = None
+        # OutputWriter holding the document staged during generation
+        self.output = None
+        self.entries = []
+        self.transcript = ""
+        self.chunk_spans = []
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.checkpoint = checkpoint and self.spill_dir is not None
+        self.memory_limit = memory_limit if self.spill_dir is not None else 0
+        self._results = {}
+        self._on_disk = set()
+        self._memory = 0
+        self._lock = threading.Lock()
+        # Per-chunk manifest (index, input hash, status, output, timing) kept
+        # next to the checkpointed results so an interrupted job can resume
+        self._manifest = {}
+        self.resumed = None
+        self.metrics = metrics or JobMetrics(video_id)
+
+    def set_transcript(self, entries):
+        self.entries = list(entries)
+        # Whitespace is normalised once so every chunk is a plain slice
+        self.transcript = " ".join(" ".join(entry["text"] for entry in self.entries).split())
+        if self.checkpoint:
+            self._write(self.spill_dir / "transcript.txt", self.transcript)
+
+    @property
+    def chunk_count(self):
+        return len(self.chunk_spans)
+
+    def chunk_text(self, idx):
+        start, end = self.chunk_spans[idx]
+        return self.transcript[start:end]
+
+    def _result_path(self, idx):
+        return self.spill_dir / f"chunk_{idx + 1}.txt"
+
+    def _write(self, path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def set_result(self, idx, text):
+        with self._lock:
+            self._memory -= len(self._results.pop(idx, ""))
+            self._on_disk.discard(idx)
+            if self.checkpoint:
+                self._write(self._result_path(idx), text)
+                self._on_disk.add(idx)
+            self._results[idx] = text
+            self._memory += len(text)
+            if self.memory_limit and self._memory > self.memory_limit:
+                self._spill()
+
+    def _spill(self):
+        for idx, text in self._results.items():
+            if idx not in self._on_disk:
+                self._write(self._result_path(idx), text)
+                self._on_disk.add(idx)
+        self._results.clear()
+        self._memory = 0
+
+    @property
+    def manifest_path(self):
+        return self.spill_dir / "manifest.json" if self.spill_dir is not None else None
+
+    def record_chunk(self, idx, **fields):
+        with self._lock:
+            record = self._manifest.setdefault(idx, {"index": idx})
+            record.update(fields)
+            if record.get("status") == "done" and idx in self._on_disk:
+                record["output"] = self._result_path(idx).name
+            if self.checkpoint:
+                self._save_manifest()
+
+    def chunk_status(self, idx):
+        with self._lock:
+            return self._manifest.get(idx, {}).get("status", "pending")
+
+    def _save_manifest(self):
+        manifest = {
+            "video_id": self.video_id,
+            "video_url": self.video_url,
+            "video_title": self.video_title,
+            "chunk_count": self.chunk_count,
+            "updated": time.time(),
+            "chunks": [self._manifest[idx] for idx in sorted(self._manifest)],
+        }
+        path = self.manifest_path
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing job manifest: {e}")
+
+    def resume(self, input_hashes):
+        # Adopts finished chunks from a previous run whose input is unchanged;
+        # everything else (pending, running, failed or changed) is redone.
+        self.resumed = []
+        if not self.checkpoint or not self.manifest_path.exists():
+            return self.resumed
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, JSONDecodeError):
+            return self.resumed
+
+        with self._lock:
+            for record in previous.get("chunks", []):
+                idx = record.get("index")
+                if not isinstance(idx, int) or not 0 <= idx < len(input_hashes):
+                    continue
+                if record.get("status") != "done" or record.get("input_hash") != input_hashes[idx]:
+                    continue
+                if not (self.spill_dir / record.get("output", "")).is_file():
+                    continue
+                self._manifest[idx] = record
+                self._on_disk.add(idx)
+                self.resumed.append(idx)
+            self._save_manifest()
+        return self.resumed
+
+    def has_result(self, idx):
+        with self._lock:
+            return idx in self._results or idx in self._on_disk
+
+    def get_result(self, idx):
+        with self._lock:
+            if idx in self._results:
+                return self._results[idx]
+            if idx not in self._on_disk:
+                return None
+        return read_file_with_fallback(self._result_path(idx))
+
+    def completed_count(self):
+        with self._lock:
+            return len(self._results.keys() | self._on_disk)
+
+    def results(self):
+        return [self.get_result(idx) for idx in range(self.chunk_count)]
+
+    def is_complete(self):
+        # Every chunk generated: once exported, nothing is left to resume
+        return all(self.chunk_status(idx) == "done" for idx in range(self.chunk_count))
+
+    def discard(self):
+        with self._lock:
+            self._results.clear()
+            self._on_disk.clear()
+            self._manifest.clear()
+            self._memory = 0
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+# -------------------------
+# Output Writer
+# -------------------------
+class OutputWriter:
+    # Builds the TXT or DOCX document one chunk at a time. Chunks must be
+    # added in order (None for a failed chunk, which is left out). The last
+    # text is held back until the next one arrives, because merging their
+    # overlap can still trim its end. layout holds every setting the
+    # document depends on, so a staged copy can be checked before reuse.
+    def __init__(self, path, layout):
+        self.path = Path(path)
+        self.layout = layout
+        self.next_idx = 0
+        self.written = 0
+        self.closed = False
+        self.elapsed = 0.0
+        self._open = None
+        self._file = None
+        self._doc = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if layout["format"] == "txt":
+            self._file = open(self.path, "w", encoding="utf-8")
+        else:
+            from docx import Document
+            from docx.shared import Pt
+            from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+            self._doc = Document()
+            if layout["title"] is not None:
+                title_para = self._doc.add_paragraph()
+                title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                run = title_para.add_run(layout["title"])
+                run.font.size = Pt(layout["title_size"])
+                self._doc.add_paragraph()
+
+    def add(self, text):
+        started = time.monotonic()
+        self.next_idx += 1
+        if self._open is not None:
+            # Only neighbouring chunks share an overlap: after a failed chunk
+            # the held text is written as it is
+            if text is not None and self.layout["merge_overlap"] and self._open and text:
+                overlap = find_overlap(self._open, text, self.layout["merge_overlap"])
+                if overlap:
+                    prev_end, next_start = overlap
+                    self._open = self._open[:prev_end]
+                    text = text[next_start:].lstrip()
+            self._emit(self._open)
+        self._open = text
+        self.elapsed += time.monotonic() - started
+
+    def feed(self, results):
+        # Adds every ChunkResult from next_idx up to the first gap and closes
+        # the document once the last chunk is in
+        while self.next_idx < len(results) and results[self.next_idx] is not None:
+            result = results[self.next_idx]
+            self.add(result.text if result.ok else None)
+        if self.next_idx == len(results) and not self.closed:
+            self.close()
+
+    def _emit(self, text):
+        # Merging can leave a chunk empty; such chunks are dropped
+        if self.layout["merge_overlap"] and not text.strip():
+            return
+        if self._file is not None:
+            if self.written:
+                self._file.write("\n\n")
+            self._file.write(text)
+        else:
+            self._doc.add_paragraph(text)
+            self._doc.add_paragraph()
+        self.written += 1
+
+    def close(self):
+        started = time.monotonic()
+        if self._open is not None:
+            self._emit(self._open)
+            self._open = None
+        if self._file is not None:
+            self._file.close()
+        else:
+            self._doc.save(str(self.path))
+            self._doc = None
+        self.closed = True
+        self.elapsed += time.monotonic() - started
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+        self._doc = None
+        self.closed = True
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def move_to(self, save_path):
+        shutil.move(str(self.path), str(save_path))
+        return str(save_path)
 
 
 # -------------------------
 # Configuration
 # -------------------------
+class JsonWriter:
+    # Write-behind JSON file: changes within `delay` seconds are coalesced
+    # into one atomic write on a background timer thread.
+    def __init__(self, path, delay=0.5):
+        self.path = Path(path)
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+
+    def schedule(self, data):
+        # Serialise now so later mutations of `data` don't race the writer
+        text = json.dumps(data, indent=2)
+        with self._lock:
+            self._pending = text
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                text, self._pending = self._pending, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if text is None:
+                return
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(text)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error writing {self.path.name}: {e}")
+
+
 class Config:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    # Runtime state written by the app itself, kept out of config.json
+    STATE_KEYS = ("last_video_id", "inline_output_name")
+
+    def __init__(self, base_dir=None):
+        # base_dir defaults to the application folder; the benchmarks point it
+        # at a scratch directory
+        self.base_dir = Path(base_dir) if base_dir else Path(__file__).parent
         self.config_file = self.base_dir / "config.json"
+        self.state_file = self.base_dir / "state.json"
         self.output_dir = self.base_dir / "outputs"
         self.temp_dir = self.base_dir / "temp"
-        self.history_file = self.base_dir / "history.json"
+        self.cache_dir = self.base_dir / "cache"
+        self.logs_dir = self.base_dir / "logs"
+        self.history_file = self.base_dir / "history.db"
         self._init_directories()
+        self._settings_writer = JsonWriter(self.config_file)
+        self._state_writer = JsonWriter(self.state_file)
         self.settings = self._load_config()
+        self.state = self._load_state()
+        atexit.register(self.flush)
+        self.history = HistoryStore(self.history_file, legacy_file=self.base_dir / "history.json")
 
     def _init_directories(self):
         self.output_dir.mkdir(exist_ok=True)
         self.temp_dir.mkdir(exist_ok=True)
-        (self.temp_dir / "yt_trans").mkdir(exist_ok=True)
-        (self.temp_dir / "yt_chunks").mkdir(exist_ok=True)
-        (self.temp_dir / "yt_pro").mkdir(exist_ok=True)
-        if not self.history_file.exists():
-            with open(self.history_file, "w") as f:
-                json.dump([], f)
+        self.cache_dir.mkdir(exist_ok=True)
+        (self.temp_dir / "jobs").mkdir(exist_ok=True)
 
     def _load_config(self):
         defaults = {
+            "chunk_mode": "tokens",
             "chunk_size": 300,
             "chunk_overlap": 50,
+            "num_ctx": 4096,
+            "chunk_context_share": 0.4,
+            "merge_overlap": True,
             "ollama_model": "deepseek-r1",
+            "ollama_host": DEFAULT_OLLAMA_HOST,
+            "ollama_hosts": [],
+            "host_probe_interval": 30,
+            "http_pool_size": 10,
+            "http_max_per_host": 8,
+            "ollama_options": {},
+            "keep_alive": "30m",
+            "warm_up_model": True,
+            "response_cache_enabled": True,
+            "response_cache_max_mb": 200,
+            "transcript_cache_ttl_hours": 168,
+            "transcript_negative_ttl_hours": 24,
             "processing_prompt": "Check and reformat the text for grammar, clarity, and proper structure.",
             "output_format": "docx",
             "skip_manual_name": False,
-            "last_video_id": "",
-            "inline_output_name": "",
             "include_docx_title": True,
             "title_font_size": 16,
             "custom_title": "",
             "retry_count": 3,
+            "generation_retries": 2,
+            "generation_timeout": 120,
+            "generation_min_timeout": 30,
+            "generation_timeout_factor": 3.0,
+            "generation_stall_timeout": 60,
+            "max_concurrent_chunks": 2,
             "typewriter_speed": 2,
+            "stream_responses": True,
+            "output_view_chunks": 5,
+            "checkpoint_jobs": False,
+            "job_memory_limit_mb": 64,
+            "resume_jobs": True,
+            "resume_max_age_hours": 168,
+            "metrics_log": True,
+            "stage_output": True,
         }
         try:
             if self.config_file.exists():
@@ -108,86 +1304,244 @@ class Config:
             pass
         return defaults
 
+    def _load_state(self):
+        state = {key: "" for key in self.STATE_KEYS}
+        # Older config.json files carry the state keys; move them over
+        migrated = [key for key in self.STATE_KEYS if key in self.settings]
+        for key in migrated:
+            state[key] = self.settings.pop(key)
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, "r") as f:
+                    state.update(json.load(f))
+        except (JSONDecodeError, OSError):
+            pass
+        if migrated:
+            self._settings_writer.schedule(self.settings)
+            self._state_writer.schedule(state)
+        return state
+
     def save_config(self):
-        with open(self.config_file, "w") as f:
-            json.dump(self.settings, f, indent=2)
+        self._settings_writer.schedule(self.settings)
+
+    def set_state(self, **values):
+        self.state.update(values)
+        self._state_writer.schedule(self.state)
+
+    def flush(self):
+        self._settings_writer.flush()
+        self._state_writer.flush()
 
     def add_to_history(self, video_id, url, title=""):
         try:
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            except (FileNotFoundError, JSONDecodeError):
-                history = []
-
-            entry = {
-                "id": video_id,
-                "url": url,
-                "title": title,
-                "date": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            history.insert(0, entry)
-            history = history[:50]
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2)
-        except Exception as e:
+            self.history.add(video_id, url, title)
+        except sqlite3.Error as e:
             print(f"Error saving history: {e}")
 
-    def load_history(self):
-        try:
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, JSONDecodeError):
-            return []
-
-    def clean_temp(self):
-        for subdir in ["yt_trans", "yt_chunks", "yt_pro"]:
+    def clean_temp(self, keep_resumable=True):
+        # Unfinished jobs with a manifest survive (so they can resume) until
+        # they are older than resume_max_age_hours
+        keep_resumable = keep_resumable and self.settings.get("resume_jobs", True)
+        max_age = float(self.settings.get("resume_max_age_hours", 168)) * 3600
+        for subdir in ["jobs"]:
             dir_path = self.temp_dir / subdir
             for item in dir_path.glob("*"):
                 if item.is_file():
                     item.unlink()
+                elif item.is_dir():
+                    manifest = item / "manifest.json"
+                    if keep_resumable and manifest.exists() and time.time() - manifest.stat().st_mtime < max_age:
+                        continue
+                    shutil.rmtree(item, ignore_errors=True)
 
 
 # -------------------------
 # Transcript Handling
 # -------------------------
 class TranscriptHandler:
-    def __init__(self, config: Config):
+    # Counters copied from Ollama's final response into results and the manifest
+    RESPONSE_METRICS = (
+        "prompt_eval_count",
+        "prompt_eval_duration",
+        "eval_count",
+        "eval_duration",
+        "load_duration",
+        "total_duration",
+        "host",
+    )
+
+    def __init__(self, config: Config, transcript_provider=None, title_provider=None):
+        # transcript_provider(video_id) -> entries and title_provider(video_id)
+        # -> title replace the YouTube lookups, e.g. for offline benchmarks
         self.config = config
+        self.transcript_provider = transcript_provider
+        self.title_provider = title_provider
         self.config.clean_temp()
+        self.client = HttpClient(
+            pool_size=int(self.config.settings.get("http_pool_size", 10)),
+            max_per_host=int(self.config.settings.get("http_max_per_host", 8)),
+        )
+        self.response_cache = ResponseCache(
+            self.config.cache_dir / "responses",
+            int(self.config.settings.get("response_cache_max_mb", 200)) * 1024 * 1024,
+        )
+        self.transcript_cache = TranscriptCache(
+            self.config.cache_dir / "transcripts",
+            float(self.config.settings.get("transcript_cache_ttl_hours", 168)) * 3600,
+            float(self.config.settings.get("transcript_negative_ttl_hours", 24)) * 3600,
+        )
+        self.title_cache = TitleCache(self.config.cache_dir / "titles.json")
+        self.throughput = ThroughputMeter()
+        self._warm_lock = threading.Lock()
+        self._warm_key = None
+        self._host_pool = None
+        self._host_pool_lock = threading.Lock()
+        # Optional semaphore held around every Ollama request; server.py sets
+        # it so jobs running side by side share one concurrency limit
+        self.generation_slots = None
+        # Background lookups (titles) that run alongside the transcript fetch
+        self.io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tyttper-io")
+
+    def warm_up(self, force=False):
+        # Starts loading the configured model in the background so the first
+        # chunk doesn't pay Ollama's cold load. Repeated calls for the same
+        # model, hosts and options are no-ops unless force is set.
+        if not self.config.settings.get("warm_up_model", True):
+            return None
+        model = self.config.settings.get("ollama_model", "deepseek-r1")
+        hosts = tuple(self.ollama_hosts())
+        options = self.generation_options()
+        key = (model, hosts, json.dumps(options, sort_keys=True))
+        with self._warm_lock:
+            if not force and self._warm_key == key:
+                return None
+            self._warm_key = key
+        # Daemon threads rather than io_pool: a slow load must not hold up exit
+        threads = []
+        for host in hosts:
+            thread = threading.Thread(
+                target=load_model,
+                args=(model, host, self.keep_alive(), self.client),
+                kwargs={"options": options},
+                name="tyttper-warmup",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def ollama_hosts(self):
+        # ollama_hosts lists every server to spread chunks over; when it is
+        # empty the single ollama_host is used
+        hosts = [host.strip() for host in self.config.settings.get("ollama_hosts") or [] if host.strip()]
+        return hosts or [self.config.settings.get("ollama_host", DEFAULT_OLLAMA_HOST)]
+
+    def host_pool(self):
+        # Rebuilt when the host list changes in Settings
+        hosts = self.ollama_hosts()
+        with self._host_pool_lock:
+            if self._host_pool is None or self._host_pool.urls != hosts:
+                if self._host_pool is not None:
+                    self._host_pool.stop()
+                self._host_pool = HostPool(
+                    hosts, self.client, float(self.config.settings.get("host_probe_interval", 30))
+                )
+                self._host_pool.start()
+            return self._host_pool
+
+    def chunk_concurrency(self):
+        # max_concurrent_chunks is per host, matching OLLAMA_NUM_PARALLEL on
+        # each server, so every extra host adds that many parallel chunks
+        per_host = max(1, int(self.config.settings.get("max_concurrent_chunks", 2)))
+        return per_host * len(self.ollama_hosts())
+
+    def keep_alive(self):
+        return keep_alive_value(self.config.settings.get("keep_alive", "30m"))
+
+    def job_model(self, job):
+        return job.model or self.config.settings.get("ollama_model", "deepseek-r1")
+
+    def job_prompt(self, job):
+        return job.prompt or self.config.settings.get(
+            "processing_prompt",
+            "Check and reformat the text for grammar, clarity, and proper structure.",
+        )
+
+    def new_job(self, video_id, video_url="", video_title=""):
+        return Job(
+            video_id,
+            video_url,
+            video_title,
+            spill_dir=self.config.temp_dir / "jobs" / video_id,
+            checkpoint=bool(
+                self.config.settings.get("checkpoint_jobs", False) or self.config.settings.get("resume_jobs", True)
+            ),
+            memory_limit=int(self.config.settings.get("job_memory_limit_mb", 64)) * 1024 * 1024,
+            metrics=JobMetrics(video_id, self.metrics_log_path(video_id)),
+        )
+
+    def metrics_log_path(self, video_id):
+        # One JSONL file per run of a job, under logs/
+        if not self.config.settings.get("metrics_log", True):
+            return None
+        return self.config.logs_dir / f"{video_id}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+    def extract_transcript(self, video_url):
+        try:
+            video_id = self.parse_video_id(video_url)
+        except ValueError as e:
+            raise RuntimeError(f"Error extracting transcript: {e}")
+
+        title_future = self.io_pool.submit(self._timed, self.get_youtube_title, video_id)
+        transcript_list, fetch_time = self._timed(self.fetch_transcript, video_id)
+        try:
+            job = self.new_job(video_id, video_url)
+            job.metrics.record_stage("fetch_transcript", fetch_time, entries=len(transcript_list))
+            job.set_transcript(transcript_list)
+            self.config.set_state(last_video_id=video_id)
+
+            job.video_title, title_time = title_future.result()
+            job.metrics.record_stage("fetch_title", title_time)
+            self.config.add_to_history(video_id, video_url, job.video_title)
+
+            return job
+        except Exception as e:
+            raise RuntimeError(f"Error extracting transcript: {e}")
+
+    @staticmethod
+    def _timed(func, *args):
+        started = time.monotonic()
+        result = func(*args)
+        return result, time.monotonic() - started
+
+    @staticmethod
+    def parse_video_id(video_url):
+        if "youtu.be" in video_url:
+            return video_url.split("/")[-1].split("?")[0]
+        match = re.search(r"v=([a-zA-Z0-9_-]+)", video_url)
+        if match:
+            return match.group(1)
+        raise ValueError("Invalid YouTube URL format")
+
+    def fetch_transcript(self, video_id):
+        cached = self.transcript_cache.get(video_id)
+        if cached is not None:
+            if "error" in cached:
+                raise RuntimeError("Transcript unavailable for this video.")
+            return cached["entries"]
 
-    def extract_and_save_transcript(self, video_url):
         retry_count = int(self.config.settings.get("retry_count", 3))
         retry_delay = 1
 
         for attempt in range(retry_count + 1):
             try:
-                if "youtu.be" in video_url:
-                    video_id = video_url.split("/")[-1]
-                else:
-                    match = re.search(r"v=([a-zA-Z0-9_-]+)", video_url)
-                    if match:
-                        video_id = match.group(1)
-                    else:
-                        raise ValueError("Invalid YouTube URL format")
-
-                transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                transcript_text = "\n".join([entry["text"] for entry in transcript_list])
-                trans_dir = self.config.temp_dir / "yt_trans"
-                transcript_file = trans_dir / f"{video_id}_transcript.txt"
-                transcript_file.write_text(transcript_text, encoding="utf-8")
-                self.config.settings["last_video_id"] = video_id
-                self.config.save_config()
-
-                video_title = self.get_youtube_title(video_id)
-                self.config.add_to_history(video_id, video_url, video_title)
-
-                return transcript_file, video_id, video_title
-            except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable):
-                if attempt < retry_count:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
+                provider = self.transcript_provider or YouTubeTranscriptApi.get_transcript
+                transcript_list = provider(video_id)
+                self.transcript_cache.put(video_id, transcript_list)
+                return transcript_list
+            except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable) as e:
+                # Permanent for this video: no point backing off and retrying
+                self.transcript_cache.put_unavailable(video_id, type(e).__name__)
                 raise RuntimeError("Transcript unavailable for this video.")
             except Exception as e:
                 if attempt < retry_count:
@@ -197,130 +1551,450 @@ class TranscriptHandler:
                 raise RuntimeError(f"Error extracting transcript: {e}")
 
     def get_youtube_title(self, video_id):
-        url = f"https://www.youtube.com/watch?v={video_id}"
+        if self.title_provider is not None:
+            return self.title_provider(video_id)
+        title = self.title_cache.get(video_id)
+        if title:
+            return title
+        title = self._fetch_oembed_title(video_id) or self._fetch_page_title(video_id)
+        if title:
+            self.title_cache.put(video_id, title)
+            return title
+        return f"Video-{video_id}"
+
+    def _fetch_oembed_title(self, video_id):
+        # The oEmbed endpoint answers with a few hundred bytes of JSON
+        url = "https://www.youtube.com/oembed"
+        params = {"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"}
         try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+            response = self.client.get(url, params=params, timeout=10)
             if response.status_code == 200:
-                pattern = r'<title>(.*?)</title>'
-                match = re.search(pattern, response.text)
-                if match:
-                    title = match.group(1).replace(' - YouTube', '').strip()
-                    return title
+                return response.json().get("title", "").strip()
         except Exception:
             pass
-        return f"Video-{video_id}"
+        return ""
+
+    def _fetch_page_title(self, video_id, max_bytes=512 * 1024):
+        # Fallback: read the watch page incrementally and stop at </title>
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        try:
+            with self.client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10, stream=True) as response:
+                if response.status_code != 200:
+                    return ""
+                received = b""
+                for block in response.iter_content(chunk_size=16384):
+                    received += block
+                    match = re.search(rb"<title>(.*?)</title>", received, re.S)
+                    if match:
+                        title = match.group(1).decode("utf-8", errors="replace")
+                        return html.unescape(title).replace(' - YouTube', '').strip()
+                    if len(received) > max_bytes:
+                        break
+        except Exception:
+            pass
+        return ""
 
-    def split_transcript(self, transcript_file):
+    def split_transcript(self, job):
         try:
-            chunk_size = int(self.config.settings.get("chunk_size", 300))
-            chunk_overlap = int(self.config.settings.get("chunk_overlap", 50))
-            content = transcript_file.read_text(encoding="utf-8")
-            words = content.split()
-            total_words = len(words)
-            chunks_dir = self.config.temp_dir / "yt_chunks"
-            chunk_files = []
-            start = 0
-            chunk_id = 1
-
-            while start < total_words:
-                end = min(start + chunk_size, total_words)
-                chunk_text = " ".join(words[start:end])
-                chunk_file = chunks_dir / f"chunk_{chunk_id}.txt"
-                chunk_file.write_text(chunk_text, encoding="utf-8")
-                chunk_files.append(chunk_file)
-                start += chunk_size - chunk_overlap
-                chunk_id += 1
-
-            return chunk_files
+            started = time.monotonic()
+            # Chunks are (start, end) views into the normalised transcript
+            text = job.transcript
+            word_starts = [match.start() for match in re.finditer(r"\S+", text)]
+            if self.config.settings.get("chunk_mode", "tokens") == "tokens":
+                ranges = self._token_ranges(job, text, word_starts)
+            else:
+                ranges = self._word_ranges(len(word_starts))
+
+            spans = []
+            for start, end in ranges:
+                end_offset = word_starts[end] - 1 if end < len(word_starts) else len(text)
+                spans.append((word_starts[start], end_offset))
+            job.chunk_spans = spans
+            job.metrics.record_stage(
+                "split", time.monotonic() - started, words=len(word_starts), chunks=job.chunk_count
+            )
+            return job.chunk_count
         except Exception as e:
             raise RuntimeError(f"Error splitting transcript: {e}")
 
-    def process_single_chunk(self, chunk_file, cancel_event=None):
+    def _word_ranges(self, total_words):
+        chunk_size = int(self.config.settings.get("chunk_size", 300))
+        chunk_overlap = int(self.config.settings.get("chunk_overlap", 50))
+        step = max(1, chunk_size - chunk_overlap)
+        ranges = []
+        start = 0
+        while start < total_words:
+            ranges.append((start, min(start + chunk_size, total_words)))
+            start += step
+        return ranges
+
+    def chunk_token_budget(self, prompt=None):
+        # Share of the model context given to the transcript text; the rest is
+        # left for the instruction and the (similarly sized) response.
+        num_ctx = int(self.config.settings.get("num_ctx", 4096))
+        share = float(self.config.settings.get("chunk_context_share", 0.4))
+        if prompt is None:
+            prompt = self.config.settings.get("processing_prompt", "")
+        overhead = estimate_tokens(prompt) + 32
+        return max(64, int(num_ctx * share) - overhead)
+
+    def _token_ranges(self, job, text, word_starts):
+        total_words = len(word_starts)
+        word_ends = [start - 1 for start in word_starts[1:]] + [len(text)]
+        words = [text[start:end] for start, end in zip(word_starts, word_ends)]
+        word_tokens = [(len(word) + 1) / 4 for word in words]
+
+        # Word indices at which a new sentence / caption entry begins
+        sentence_breaks = {i + 1 for i, word in enumerate(words) if SENTENCE_END.search(word)}
+        entry_breaks = set()
+        position = 0
+        for entry in job.entries:
+            position += len(entry["text"].split())
+            entry_breaks.add(position)
+
+        budget = self.chunk_token_budget(self.job_prompt(job))
+        overlap = int(self.config.settings.get("chunk_overlap", 50))
+        ranges = []
+        start = 0
+
+        while start < total_words:
+            tokens = 0
+            end = start
+            sentence_cut = entry_cut = None
+            while end < total_words:
+                if tokens + word_tokens[end] > budget and end > start:
+                    break
+                tokens += word_tokens[end]
+                end += 1
+                if end in sentence_breaks:
+                    sentence_cut = end
+                if end in entry_breaks:
+                    entry_cut = end
+
+            if end < total_words:
+                # Prefer ending on a sentence, then on a caption entry, as long
+                # as the chunk stays at least half full
+                half = start + (end - start) // 2
+                if sentence_cut and sentence_cut > half:
+                    end = sentence_cut
+                elif entry_cut and entry_cut > half:
+                    end = entry_cut
+            ranges.append((start, end))
+            if end >= total_words:
+                break
+
+            next_start = end
+            if overlap > 0:
+                low = max(start + 1, end - overlap)
+                window = range(low, end)
+                boundaries = [i for i in window if i in sentence_breaks] or [i for i in window if i in entry_breaks]
+                next_start = boundaries[0] if boundaries else low
+            start = next_start
+        return ranges
+
+    def generation_options(self):
+        options = dict(self.config.settings.get("ollama_options") or {})
+        num_ctx = int(self.config.settings.get("num_ctx", 4096))
+        if num_ctx > 0:
+            options.setdefault("num_ctx", num_ctx)
+        return options
+
+    def chunk_input_hash(self, job, idx):
+        return ResponseCache.make_key(
+            self.job_model(job),
+            self.job_prompt(job),
+            job.chunk_text(idx),
+            self.generation_options(),
+        )
+
+    def resume_job(self, job):
+        if job.resumed is None:
+            if self.config.settings.get("resume_jobs", True):
+                job.resume([self.chunk_input_hash(job, idx) for idx in range(job.chunk_count)])
+            else:
+                job.resumed = []
+        return job.resumed
+
+    def generation_timeout(self, prompt, chunk_content):
+        # Deadline for a request's first token. Until a response has been
+        # measured the configured timeout applies; afterwards it follows the
+        # observed speed and output length, so a request queued behind others
+        # on the same host still gets its turn.
+        estimate = self.throughput.estimate(estimate_tokens(prompt), estimate_tokens(chunk_content))
+        if estimate is None:
+            return float(self.config.settings.get("generation_timeout", 120))
+        factor = float(self.config.settings.get("generation_timeout_factor", 3.0))
+        return max(float(self.config.settings.get("generation_min_timeout", 30)), estimate * factor)
+
+    def process_single_chunk(self, job, idx, cancel_event=None, on_token=None, use_cache=None):
+        started = time.time()
+        attempts = 0
         try:
-            chunk_content = chunk_file.read_text(encoding="utf-8")
-            processing_prompt = self.config.settings.get(
-                "processing_prompt",
-                "Check and reformat the text for grammar, clarity, and proper structure.",
+            chunk_content = job.chunk_text(idx)
+            processing_prompt = self.job_prompt(job)
+            model = self.job_model(job)
+            options = self.generation_options()
+            if use_cache is None:
+                use_cache = self.config.settings.get("response_cache_enabled", True)
+
+            input_hash = ResponseCache.make_key(model, processing_prompt, chunk_content, options)
+            job.record_chunk(idx, input_hash=input_hash, status="running", started=started)
+            generated_text = None
+            cached = False
+            metrics = {}
+            if use_cache:
+                generated_text = self.response_cache.get(input_hash)
+                if generated_text is not None:
+                    cached = True
+                    if on_token is not None:
+                        on_token(generated_text)
+
+            if generated_text is None:
+                generated_text, attempts, json_response = self._generate_with_retries(
+                    processing_prompt, chunk_content, model, options, cancel_event, on_token
+                )
+                metrics = {key: json_response[key] for key in self.RESPONSE_METRICS if key in json_response}
+                # Only successful completions are cached, never errors
+                if use_cache:
+                    self.response_cache.put(input_hash, generated_text)
+
+            job.set_result(idx, generated_text)
+            finished = time.time()
+            job.record_chunk(
+                idx,
+                status="done",
+                finished=finished,
+                duration=round(finished - started, 3),
+                attempts=attempts,
+                **metrics,
             )
-            combined_prompt = (
-                f"Processing Instruction:\n{processing_prompt}\n\n"
-                f"Apply the above instruction to the following text:\n{chunk_content}"
+            return ChunkResult(
+                idx, generated_text, attempts=attempts, cached=cached, metrics=metrics, duration=finished - started
             )
-            generated_text, _ = generate_response(
-                combined_prompt,
-                self.config.settings.get("ollama_model", "deepseek-r1"),
-                cancel_event=cancel_event,
+        except GenerationCancelled:
+            finished = time.time()
+            job.record_chunk(idx, status="cancelled", finished=finished, attempts=attempts)
+            return ChunkResult(
+                idx, status="cancelled", error="Generation cancelled", attempts=attempts, duration=finished - started
             )
-            output_dir = self.config.temp_dir / "yt_pro"
-            output_dir.mkdir(exist_ok=True)
-            output_file = output_dir / chunk_file.name
-            output_file.write_text(generated_text, encoding="utf-8")
-            return generated_text
         except Exception as e:
-            return f"[Error processing chunk: {e}]"
+            finished = time.time()
+            attempts = getattr(e, "attempts", attempts)
+            job.record_chunk(idx, status="failed", finished=finished, error=str(e), attempts=attempts)
+            return ChunkResult(idx, status="failed", error=str(e), attempts=attempts, duration=finished - started)
+
+    def _generate_with_retries(self, system_prompt, chunk_content, model, options, cancel_event, on_token):
+        # The instruction goes in a system message that is identical for every
+        # chunk, so Ollama only evaluates the chunk text itself. Each attempt
+        # goes to the least busy host. A chunk whose host went away fails over
+        # to another host straight away, without using up a retry. Other
+        # transient failures back off with full jitter, so chunks that failed
+        # together don't retry in lockstep, and timed-out attempts get a
+        # longer deadline. Returns (text, attempts, final_json).
+        retries = int(self.config.settings.get("generation_retries", 2))
+        timeout = self.generation_timeout(system_prompt + chunk_content, chunk_content)
+        pool = self.host_pool()
+        failed_hosts = set()
+        attempt = 0
+        failovers = 0
+        while True:
+            # The slot is held for the request only, never through a backoff
+            with self.generation_slots or nullcontext():
+                host = pool.acquire(model, exclude=failed_hosts)
+                try:
+                    text, json_response = generate(
+                        chunk_content,
+                        model,
+                        host=host.url,
+                        cancel_event=cancel_event,
+                        on_token=on_token,
+                        client=self.client,
+                        options=options,
+                        timeout=timeout,
+                        keep_alive=self.keep_alive(),
+                        system=system_prompt,
+                        stall_timeout=float(self.config.settings.get("generation_stall_timeout", 60)),
+                    )
+                except GenerationCancelled:
+                    pool.release(host)
+                    raise
+                except GenerationError as e:
+                    pool.release(host, e)
+                    error = e
+                else:
+                    pool.release(host)
+                    self.throughput.record(json_response, estimate_tokens(chunk_content))
+                    json_response["host"] = host.url
+                    return text, attempt + failovers + 1, json_response
+
+            failed_hosts.add(host)
+            error.attempts = attempt + failovers + 1
+            if isinstance(error, HostUnavailable) and failovers < len(pool) - 1 and pool.healthy_count():
+                failovers += 1
+                if on_token is not None:
+                    on_token(RetryNotice(f"{host.url} unavailable, retrying on another host"))
+                continue
+            if not error.transient or attempt == retries:
+                raise error
+            attempt += 1
+            if isinstance(error, GenerationTimeout):
+                timeout *= 1.5
+            if on_token is not None:
+                on_token(RetryNotice(f"Retrying: {error}"))
+            delay = random.uniform(0, min(30, 2 ** (attempt - 1)))
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise GenerationCancelled()
+            else:
+                time.sleep(delay)
+
+    def process_chunks(self, job, cancel_event=None, on_token=None, on_result=None):
+        # Keeps up to max_concurrent_chunks requests per host in flight. on_token(idx, token)
+        # streams tokens, on_result(idx, result) fires as each chunk completes
+        # (in completion order); the return value is a list of ChunkResult in
+        # chunk order. Chunks finished by an earlier run of the same job are
+        # reported, not redone.
+        concurrency = self.chunk_concurrency()
+        results = [None] * job.chunk_count
+        writer = self.stage_output(job)
+        resumed = set(self.resume_job(job))
+        for idx in sorted(resumed):
+            results[idx] = ChunkResult(idx, job.get_result(idx))
+            if on_result:
+                on_result(idx, results[idx])
+        writer = self._feed_output(writer, results)
+
+        job.metrics.start_generation()
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="tyttper-chunk")
+        try:
+            futures = {}
+            for idx in range(job.chunk_count):
+                if idx in resumed:
+                    continue
+                chunk_on_token = (lambda token, idx=idx: on_token(idx, token)) if on_token else None
+                future = executor.submit(self.process_single_chunk, job, idx, cancel_event, chunk_on_token)
+                futures[future] = idx
+
+            # Polls so a cancel returns at once, even while a request is
+            # still waiting for Ollama's first byte
+            pending = set(futures)
+            while pending and not (cancel_event and cancel_event.is_set()):
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = futures[future]
+                    results[idx] = future.result()
+                    job.metrics.record_chunk(results[idx])
+                    if on_result:
+                        on_result(idx, results[idx])
+                writer = self._feed_output(writer, results)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            job.metrics.record_stage(
+                "generate", time.monotonic() - started, concurrency=concurrency, resumed=len(resumed)
+            )
+            if writer is not None:
+                if writer.closed:
+                    job.output = writer
+                    job.metrics.record_stage("stage_output", writer.elapsed, chunks=writer.written)
+                else:
+                    # Cancelled part-way: the document would be incomplete
+                    writer.discard()
+            job.metrics.write_summary()
+        return results
 
-    def combine_chunks_to_output(self, video_id, video_title="", status_callback=None):
-        processed_dir = self.config.temp_dir / "yt_pro"
-        processed_files = sorted(processed_dir.glob("*.txt"))
-        if not processed_files:
+    def stage_output(self, job):
+        # Starts the document that process_chunks fills in as chunks finish,
+        # laid out for the configured output format
+        if not self.config.settings.get("stage_output", True) or job.spill_dir is None:
+            return None
+        output_format = self.job_output_format(job)
+        path = job.spill_dir / f"output.{output_format}"
+        try:
+            return OutputWriter(path, self.output_layout(job, path))
+        except Exception as e:
+            print(f"Error staging output: {e}")
+            return None
+
+    @staticmethod
+    def _feed_output(writer, results):
+        # Staging is an optimisation: if it fails, Save builds the file instead
+        if writer is None:
+            return None
+        try:
+            writer.feed(results)
+            return writer
+        except Exception as e:
+            print(f"Error staging output: {e}")
+            writer.discard()
+            return None
+
+    def default_output_name(self, video_id):
+        if self.config.settings.get("skip_manual_name", False):
+            return video_id
+        return self.config.state.get("inline_output_name", "").strip() or video_id
+
+    def combine_chunks_to_output(self, job, save_path, status_callback=None):
+        if job is None or not job.completed_count():
             if status_callback:
                 status_callback("Error: No processed chunks to combine.", "#ff7373")
             return
 
-        if self.config.settings.get("skip_manual_name", False):
-            default_name = video_id
-        else:
-            default_name = self.config.settings.get("inline_output_name", "").strip() or video_id
-
-        output_format = self.config.settings.get("output_format", "docx").lower()
-        filetypes = "DOCX Files (*.docx);;TXT Files (*.txt)"
-        filter_name = "DOCX Files (*.docx)" if output_format == "docx" else "TXT Files (*.txt)"
-
-        save_path, _ = QFileDialog.getSaveFileName(
-            parent=None,
-            caption="Save Output",
-            dir=str(self.config.output_dir / default_name),
-            filter=filetypes,
-            selectedFilter=filter_name
-        )
-
         if not save_path:
             if status_callback:
                 status_callback("Save cancelled by user.", "#ff7373")
             return
 
         try:
-            if save_path.lower().endswith(".txt"):
-                combined_text = "\n\n".join([read_file_with_fallback(f) for f in processed_files])
-                with open(save_path, "w", encoding="utf-8") as f:
-                    f.write(combined_text)
-            else:
-                from docx import Document
-                from docx.shared import Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-                doc = Document()
-                if self.config.settings.get("include_docx_title", True):
-                    custom_title = self.config.settings.get("custom_title", "").strip()
-                    if not custom_title and video_title:
-                        title_text = video_title
-                    else:
-                        title_text = custom_title or Path(save_path).stem
-
-                    title_para = doc.add_paragraph()
-                    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    run = title_para.add_run(title_text)
-                    run.font.size = Pt(int(self.config.settings.get("title_font_size", 16)))
-                    doc.add_paragraph()
-
-                for file in processed_files:
-                    content = read_file_with_fallback(file)
-                    doc.add_paragraph(content)
-                    doc.add_paragraph()
-                doc.save(save_path)
-
+            self.write_output(job, save_path)
+            if job.is_complete():
+                job.discard()
             if status_callback:
                 status_callback(f"Success: File saved at {save_path}", "#b5e0a8")
         except Exception as e:
             if status_callback:
                 status_callback(f"Error saving file: {e}", "#ff7373")
+
+    def job_output_format(self, job):
+        return (job.output_format or self.config.settings.get("output_format", "docx")).lower()
+
+    def output_layout(self, job, save_path):
+        # Everything the document depends on besides the chunk texts
+        save_path = str(save_path)
+        output_format = "txt" if save_path.lower().endswith(".txt") else "docx"
+        chunk_overlap = int(self.config.settings.get("chunk_overlap", 50))
+        # Words the chunks share at each boundary, 0 when they aren't merged
+        merge_overlap = chunk_overlap if self.config.settings.get("merge_overlap", True) else 0
+        title = None
+        if output_format == "docx" and self.config.settings.get("include_docx_title", True):
+            custom_title = self.config.settings.get("custom_title", "").strip()
+            title = custom_title or job.video_title or Path(save_path).stem
+        return {
+            "format": output_format,
+            "merge_overlap": max(0, merge_overlap),
+            "title": title,
+            "title_size": int(self.config.settings.get("title_font_size", 16)),
+        }
+
+    def write_output(self, job, save_path):
+        with job.metrics.stage("export", path=str(save_path)):
+            staged, job.output = job.output, None
+            if staged is not None:
+                # Saving the staged document is a move, whatever the length
+                if staged.written and staged.layout == self.output_layout(job, save_path):
+                    try:
+                        return staged.move_to(save_path)
+                    except OSError as e:
+                        print(f"Error moving staged output, rebuilding it: {e}")
+                staged.discard()
+            return self._write_output(job, save_path)
+
+    def _write_output(self, job, save_path):
+        texts = job.results()
+        if all(text is None for text in texts):
+            raise RuntimeError("No processed chunks to combine.")
+        writer = OutputWriter(save_path, self.output_layout(job, save_path))
+        for text in texts:
+            writer.add(text)
+        writer.close()
+        return str(save_path)
@@ -1,12 +1,12 @@
 from PySide6.QtWidgets import (
     QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QLineEdit, QTextEdit, QProgressBar, QComboBox, QCheckBox,
+    QPushButton, QLineEdit, QTextEdit, QPlainTextEdit, QPlainTextDocumentLayout, QProgressBar, QComboBox, QCheckBox,
     QFileDialog, QSizePolicy, QScrollArea, QFrame, QGroupBox, QTabWidget,
-    QListWidget, QListWidgetItem, QGridLayout, QMessageBox
+    QListView, QGridLayout, QMessageBox
 )
-from PySide6.QtCore import Qt, QTimer, QThread, Signal
-from PySide6.QtGui import QFont, QColor, QPalette, QTextCursor
-from function import Config, TranscriptHandler
+from PySide6.QtCore import Qt, QTimer, QThread, Signal, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QFont, QColor, QPalette, QTextCursor, QTextDocument
+from function import Config, TranscriptHandler, DEFAULT_OLLAMA_HOST
 import process
 import time
 import re
@@ -23,6 +23,8 @@ class MainWindow(QMainWindow):
         # Initialize config and handler
         self.config = Config()
         self.handler = TranscriptHandler(self.config)
+        # The model loads while the splash animation plays
+        self.handler.warm_up()
         
         # Create stacked widget for screens
         self.stacked_widget = QStackedWidget()
@@ -77,7 +79,7 @@ class MainWindow(QMainWindow):
         }
         widget = screens[screen_name]
         if screen_name == "history":
-            widget.load_history()  # dynamically reload history.json
+            widget.load_history()  # pick up entries added since the last visit
         self.stacked_widget.setCurrentWidget(widget)
     
     def start_processing(self, video_url):
@@ -264,16 +266,25 @@ class StartScreen(QWidget):
 
 class ProcessingScreen(QWidget):
     update_progress = Signal(int,int)
-    update_text = Signal(str)
     update_status = Signal(str,str)
     processing_complete = Signal()
+    FRAME_INTERVAL_MS = 16  # output is rendered at most once per display frame
+    CHUNK_HEADER_PREFIX = "--- Chunk "
     
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
         self.cancel_processing = False
+        self.job = None
         self.video_id = ""
         self.video_title = ""
+        self.text_buffer = None
+        self.worker = None
+        
+        # Drains the worker's text buffer with one insert per frame
+        self.render_timer = QTimer(self)
+        self.render_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self.render_timer.timeout.connect(self.render_frame)
         
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -282,6 +293,9 @@ class ProcessingScreen(QWidget):
         self.progress_label = QLabel("Processing: 0/0")
         self.progress_label.setStyleSheet("color:white; font-size:12pt;")
         top_layout.addWidget(self.progress_label)
+        self.metrics_label = QLabel("")
+        self.metrics_label.setStyleSheet("color:#a0a0c0; font-size:11pt;")
+        top_layout.addWidget(self.metrics_label, alignment=Qt.AlignCenter)
         self.spinner_label = QLabel("")
         self.spinner_label.setStyleSheet("color:white; font-size:16pt;")
         top_layout.addWidget(self.spinner_label, alignment=Qt.AlignRight)
@@ -299,16 +313,39 @@ class ProcessingScreen(QWidget):
         """)
         layout.addWidget(self.progress_bar)
         
-        self.response_text = QTextEdit()
+        # Only the most recent chunks stay in the live document; older ones
+        # are paged back in from the job's stored results on request
+        nav_layout = QHBoxLayout()
+        nav_style = "background:#3b3b5e; color:white; padding:4px 10px; border-radius:4px;"
+        self.older_btn = QPushButton("◀ Older")
+        self.older_btn.setStyleSheet(nav_style)
+        self.older_btn.clicked.connect(self.show_older_chunks)
+        nav_layout.addWidget(self.older_btn)
+        self.view_label = QLabel("")
+        self.view_label.setStyleSheet("color:#a0a0c0; font-size:10pt;")
+        nav_layout.addWidget(self.view_label, alignment=Qt.AlignCenter)
+        self.newer_btn = QPushButton("Newer ▶")
+        self.newer_btn.setStyleSheet(nav_style)
+        self.newer_btn.clicked.connect(self.show_newer_chunks)
+        nav_layout.addWidget(self.newer_btn)
+        layout.addLayout(nav_layout)
+        
+        self.response_text = QPlainTextEdit()
         self.response_text.setReadOnly(True)
         self.response_text.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color:#2e2e3f; color:#f0f0f0;
                 font-family:'Segoe UI'; font-size:11pt;
                 border-radius:5px; padding:10px;
             }
         """)
+        # Both documents belong to the screen so switching between them
+        # never deletes either one
+        self.live_doc = self.create_plain_document()
+        self.browse_doc = self.create_plain_document()
+        self.response_text.setDocument(self.live_doc)
         layout.addWidget(self.response_text)
+        self.reset_output_view()
         
         footer_layout = QHBoxLayout()
         footer_layout.addWidget(QLabel("Filename:"))
@@ -335,37 +372,157 @@ class ProcessingScreen(QWidget):
         layout.addWidget(self.status_label)
         
         self.update_progress.connect(self.update_progress_display)
-        self.update_text.connect(self.update_text_display)
         self.update_status.connect(self.update_status_display)
         self.processing_complete.connect(self.on_processing_complete)
     
+    def create_plain_document(self):
+        doc = QTextDocument(self)
+        doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+        return doc
+    
+    def reset_output_view(self):
+        self.live_doc.clear()
+        self.browse_doc.clear()
+        self.response_text.setDocument(self.live_doc)
+        self.chunks_shown = 0
+        self.live_chunks = 0
+        self.browse_start = None
+        self._header_tail = ""
+        self.update_view_controls()
+    
+    def view_window(self):
+        return max(1, int(self.parent.config.settings.get("output_view_chunks", 5)))
+    
+    def first_live_chunk(self):
+        return self.chunks_shown - self.live_chunks
+    
     def start_processing(self, video_url):
         self.cancel_processing = False
-        self.response_text.clear()
+        self.job = None
+        self.reset_output_view()
         self.progress_bar.setValue(0)
         self.progress_label.setText("Processing: 0/0")
+        self.metrics_label.setText("")
         self.status_label.setText("")
-        self.filename_entry.setText(self.parent.config.settings.get("last_video_id",""))
+        self.filename_entry.setText(self.parent.config.state.get("last_video_id",""))
         
         self.worker = process.ProcessingWorker(self.parent, video_url)
         self.worker.update_progress.connect(self.update_progress.emit)
-        self.worker.update_text.connect(self.update_text.emit)
         self.worker.update_status.connect(self.update_status.emit)
+        self.worker.update_metrics.connect(self.metrics_label.setText)
         self.worker.finished.connect(self.on_worker_finished)
+        self.text_buffer = self.worker.text_buffer
         self.worker.start()
+        self.render_timer.start()
     
     def update_progress_display(self, current, total):
         self.progress_label.setText(f"Processing: {current}/{total}")
-        self.progress_bar.setValue(int((current/total)*100))
+        self.progress_bar.setValue(int((current/total)*100) if total else 0)
         spinner = ["◐","◓","◑","◒"][current % 4]
         self.spinner_label.setText(spinner)
     
+    def render_frame(self):
+        if self.text_buffer is None:
+            return
+        retracted = self.text_buffer.take_retracted()
+        if retracted:
+            # A retried chunk's abandoned text, always at the end of the view
+            cursor = QTextCursor(self.live_doc)
+            cursor.movePosition(QTextCursor.End)
+            cursor.movePosition(QTextCursor.Left, QTextCursor.KeepAnchor, retracted)
+            cursor.removeSelectedText()
+        backlog = len(self.text_buffer)
+        if not backlog:
+            if not self.worker.isRunning():
+                self.render_timer.stop()
+            return
+        self.update_text_display(self.text_buffer.drain(self.frame_char_budget(backlog)))
+    
+    def frame_char_budget(self, backlog):
+        # The typewriter effect only paces the display, never the worker
+        speed = self.parent.config.settings.get("typewriter_speed", 2)
+        if speed <= 0:
+            return None
+        per_frame = max(1, int(self.FRAME_INTERVAL_MS / speed))
+        # Large backlogs (cached or resumed chunks) catch up within about half a second
+        return max(per_frame, backlog // 30)
+    
     def update_text_display(self, text):
-        cursor = self.response_text.textCursor()
+        cursor = QTextCursor(self.live_doc)
         cursor.movePosition(QTextCursor.End)
         cursor.insertText(text)
-        self.response_text.setTextCursor(cursor)
-        self.response_text.ensureCursorVisible()
+        
+        # Count chunk headers, including one split across two frames
+        scan = self._header_tail + text
+        new_headers = scan.count(self.CHUNK_HEADER_PREFIX)
+        self._header_tail = scan[-(len(self.CHUNK_HEADER_PREFIX) - 1):]
+        if new_headers:
+            self.chunks_shown += new_headers
+            self.live_chunks += new_headers
+            self.trim_live_view()
+            self.update_view_controls()
+        
+        if self.browse_start is None:
+            scrollbar = self.response_text.verticalScrollBar()
+            scrollbar.setValue(scrollbar.maximum())
+    
+    def trim_live_view(self):
+        while self.live_chunks > self.view_window():
+            # The second header marks where the oldest live chunk ends
+            first = self.live_doc.find(self.CHUNK_HEADER_PREFIX, 0)
+            second = self.live_doc.find(self.CHUNK_HEADER_PREFIX, first) if not first.isNull() else first
+            if second.isNull():
+                break
+            cursor = QTextCursor(self.live_doc)
+            cursor.setPosition(0)
+            cursor.setPosition(second.block().position(), QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+            self.live_chunks -= 1
+    
+    def show_older_chunks(self):
+        start = self.first_live_chunk() if self.browse_start is None else self.browse_start
+        if start <= 0 or self.job is None:
+            return
+        self.browse_start = max(0, start - self.view_window())
+        self.render_browse_page()
+    
+    def show_newer_chunks(self):
+        if self.browse_start is None:
+            return
+        self.browse_start += self.view_window()
+        if self.browse_start >= self.first_live_chunk():
+            self.browse_start = None
+            self.response_text.setDocument(self.live_doc)
+            scrollbar = self.response_text.verticalScrollBar()
+            scrollbar.setValue(scrollbar.maximum())
+            self.update_view_controls()
+        else:
+            self.render_browse_page()
+    
+    def render_browse_page(self):
+        end = min(self.browse_start + self.view_window(), self.first_live_chunk())
+        parts = []
+        for idx in range(self.browse_start, end):
+            parts.append(self.worker.chunk_header(idx))
+            parts.append(self.job.get_result(idx) or "")
+        self.browse_doc.setPlainText("".join(parts))
+        self.response_text.setDocument(self.browse_doc)
+        self.response_text.verticalScrollBar().setValue(0)
+        self.update_view_controls()
+    
+    def update_view_controls(self):
+        if self.browse_start is None:
+            first, last = self.first_live_chunk(), self.chunks_shown
+            self.newer_btn.setEnabled(False)
+        else:
+            first = self.browse_start
+            last = min(self.browse_start + self.view_window(), self.first_live_chunk())
+            self.newer_btn.setEnabled(True)
+        self.older_btn.setEnabled(first > 0)
+        if self.chunks_shown:
+            self.view_label.setText(f"Chunks {first + 1}–{last} of {self.chunks_shown}")
+        else:
+            self.view_label.setText("")
     
     def update_status_display(self, message, color):
         self.status_label.setText(message)
@@ -375,30 +532,58 @@ class ProcessingScreen(QWidget):
         self.processing_complete.emit()
     
     def on_processing_complete(self):
-        self.status_label.setText("Processing complete. Enter filename and press Save.")
-        self.status_label.setStyleSheet("color:#b5e0a8; font-size:12pt;")
+        if self.cancel_processing:
+            return
+        failed = 0
+        if self.job is not None:
+            failed = sum(1 for idx in range(self.job.chunk_count) if self.job.chunk_status(idx) == "failed")
+        if failed:
+            self.status_label.setText(f"{failed} chunk(s) failed and will be left out. Enter filename and press Save.")
+            self.status_label.setStyleSheet("color:#ff7373; font-size:12pt;")
+        else:
+            self.status_label.setText("Processing complete. Enter filename and press Save.")
+            self.status_label.setStyleSheet("color:#b5e0a8; font-size:12pt;")
         self.filename_entry.setText(self.video_id)
-        self.parent.config.settings["inline_output_name"] = self.video_id
-        self.parent.config.save_config()
+        self.parent.config.set_state(inline_output_name=self.video_id)
     
     def save_output(self):
         name = self.filename_entry.text().strip()
-        self.parent.config.settings["inline_output_name"] = name
-        self.parent.config.save_config()
+        self.parent.config.set_state(inline_output_name=name)
         def status_callback(message, color):
             self.update_status.emit(message, color)
+        save_path = self.ask_save_path()
         # FIX: Properly indent the combine_output call inside the method
-        process.combine_output(self.parent, self.video_id, self.video_title, status_callback)
+        process.combine_output(self.parent, self.job, save_path, status_callback)
         # FIX: Add timer navigation inside the method
         QTimer.singleShot(3000, lambda: self.parent.show_screen("menu"))
     
+    def ask_save_path(self):
+        if self.job is None or not self.job.completed_count():
+            return ""
+        default_name = self.parent.handler.default_output_name(self.video_id)
+        output_format = self.parent.config.settings.get("output_format", "docx").lower()
+        filetypes = "DOCX Files (*.docx);;TXT Files (*.txt)"
+        filter_name = "DOCX Files (*.docx)" if output_format == "docx" else "TXT Files (*.txt)"
+
+        save_path, _ = QFileDialog.getSaveFileName(
+            parent=self,
+            caption="Save Output",
+            dir=str(self.parent.config.output_dir / default_name),
+            filter=filetypes,
+            selectedFilter=filter_name
+        )
+        return save_path
+
     def cancel(self):
         self.cancel_processing = True
+        if self.worker is not None:
+            self.worker.request_cancel()
         self.status_label.setText("Cancelling...")
         self.status_label.setStyleSheet("color:#ff7373; font-size:12pt;")
         QTimer.singleShot(500, self.back_to_menu)
     
     def back_to_menu(self):
+        self.render_timer.stop()
         self.parent.config.clean_temp()
         self.parent.show_screen("menu")
 
@@ -483,6 +668,24 @@ class SettingsScreen(QWidget):
         group.setLayout(group_layout)
         layout.addWidget(group)
 
+        # Chunk mode
+        chunk_mode_layout = QHBoxLayout()
+        chunk_mode_layout.addWidget(QLabel("Chunk Mode:"))
+        self.chunk_mode_combo = QComboBox()
+        self.chunk_mode_combo.addItems(["tokens", "words"])
+        self.chunk_mode_combo.setCurrentText(self.parent.config.settings["chunk_mode"])
+        self.chunk_mode_combo.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        chunk_mode_layout.addWidget(self.chunk_mode_combo)
+        group_layout.addLayout(chunk_mode_layout)
+
+        # Model context size
+        num_ctx_layout = QHBoxLayout()
+        num_ctx_layout.addWidget(QLabel("Context Size (tokens):"))
+        self.num_ctx_entry = QLineEdit(str(self.parent.config.settings["num_ctx"]))
+        self.num_ctx_entry.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        num_ctx_layout.addWidget(self.num_ctx_entry)
+        group_layout.addLayout(num_ctx_layout)
+
         # Chunk size
         chunk_size_layout = QHBoxLayout()
         chunk_size_layout.addWidget(QLabel("Chunk Size (words):"))
@@ -507,8 +710,27 @@ class SettingsScreen(QWidget):
         retry_layout.addWidget(self.retry_entry)
         group_layout.addLayout(retry_layout)
 
+        # Generation retries
+        generation_retry_layout = QHBoxLayout()
+        generation_retry_layout.addWidget(QLabel("Generation Retries:"))
+        self.generation_retry_entry = QLineEdit(str(self.parent.config.settings["generation_retries"]))
+        self.generation_retry_entry.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        generation_retry_layout.addWidget(self.generation_retry_entry)
+        group_layout.addLayout(generation_retry_layout)
+
+        # Concurrent requests
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("Concurrent Requests:"))
+        self.concurrency_entry = QLineEdit(str(self.parent.config.settings["max_concurrent_chunks"]))
+        self.concurrency_entry.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        concurrency_layout.addWidget(self.concurrency_entry)
+        group_layout.addLayout(concurrency_layout)
+
         # Description
-        desc = QLabel("Chunk size and overlap are in words. Retry count is for transcript extraction.")
+        desc = QLabel("Token mode fills each chunk to a share of the context size and ends it on a sentence;\n"
+                      "chunk size only applies in word mode. Overlap is in words. Retry count is for transcript extraction,\n"
+                      "generation retries for chunks that time out or lose their connection.\n"
+                      "Concurrent requests are per Ollama host and should not exceed its OLLAMA_NUM_PARALLEL.")
         desc.setStyleSheet("color: #a0a0c0; font-size: 10pt; margin-top: 10px;")
         group_layout.addWidget(desc)
 
@@ -532,6 +754,24 @@ class SettingsScreen(QWidget):
         model_layout.addWidget(self.ollama_model_entry)
         group_layout.addLayout(model_layout)
 
+        # Ollama host
+        host_layout = QHBoxLayout()
+        host_layout.addWidget(QLabel("Ollama Host(s):"))
+        self.ollama_host_entry = QLineEdit(", ".join(self.parent.handler.ollama_hosts()))
+        self.ollama_host_entry.setToolTip("Separate several servers with commas; chunks are spread across them")
+        self.ollama_host_entry.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        host_layout.addWidget(self.ollama_host_entry)
+        group_layout.addLayout(host_layout)
+
+        # Keep alive
+        keep_alive_layout = QHBoxLayout()
+        keep_alive_layout.addWidget(QLabel("Keep Model Loaded:"))
+        self.keep_alive_entry = QLineEdit(str(self.parent.config.settings["keep_alive"]))
+        self.keep_alive_entry.setToolTip("How long Ollama keeps the model in memory after a request, e.g. 30m, 2h or -1 for always")
+        self.keep_alive_entry.setStyleSheet("background: #2e2e3f; padding: 5px;")
+        keep_alive_layout.addWidget(self.keep_alive_entry)
+        group_layout.addLayout(keep_alive_layout)
+
         # Processing prompt
         group_layout.addWidget(QLabel("Processing Prompt:"))
         self.processing_prompt_entry = QTextEdit()
@@ -539,8 +779,20 @@ class SettingsScreen(QWidget):
         self.processing_prompt_entry.setStyleSheet("background: #2e2e3f; padding: 5px; min-height: 150px;")
         group_layout.addWidget(self.processing_prompt_entry)
 
+        # Streaming
+        self.stream_check = QCheckBox("Stream Responses")
+        self.stream_check.setChecked(bool(self.parent.config.settings["stream_responses"]))
+        group_layout.addWidget(self.stream_check)
+
+        # Response cache
+        self.response_cache_check = QCheckBox("Use Response Cache")
+        self.response_cache_check.setChecked(bool(self.parent.config.settings["response_cache_enabled"]))
+        group_layout.addWidget(self.response_cache_check)
+
         # Description
-        desc = QLabel("This prompt will be sent to Ollama with each chunk of text.")
+        desc = QLabel("This prompt will be sent to Ollama with each chunk of text.\n"
+                      "Streaming shows tokens as Ollama generates them.\n"
+                      "The response cache reuses earlier results when the model, prompt and chunk are unchanged.")
         desc.setStyleSheet("color: #a0a0c0; font-size: 10pt; margin-top: 10px;")
         group_layout.addWidget(desc)
 
@@ -575,6 +827,10 @@ class SettingsScreen(QWidget):
         self.include_title_check = QCheckBox("Include Title")
         checkbox_layout.addWidget(self.include_title_check)
 
+        self.merge_overlap_check = QCheckBox("Merge Chunk Overlap")
+        self.merge_overlap_check.setChecked(bool(self.parent.config.settings["merge_overlap"]))
+        checkbox_layout.addWidget(self.merge_overlap_check)
+
         group_layout.addLayout(checkbox_layout)
 
         # Title settings
@@ -601,7 +857,8 @@ class SettingsScreen(QWidget):
         group_layout.addLayout(speed_layout)
 
         # Description
-        desc = QLabel("Leave custom title blank to use filename as title.")
+        desc = QLabel("Leave custom title blank to use filename as title. Typewriter speed 0 shows output instantly.\n"
+                      "Merging removes the text repeated where overlapping chunks meet.")
         desc.setStyleSheet("color: #a0a0c0; font-size: 10pt; margin-top: 10px;")
         group_layout.addWidget(desc)
 
@@ -609,19 +866,32 @@ class SettingsScreen(QWidget):
 
     def save_settings(self):
         try:
+            self.parent.config.settings["chunk_mode"] = self.chunk_mode_combo.currentText()
+            self.parent.config.settings["num_ctx"] = int(self.num_ctx_entry.text())
             self.parent.config.settings["chunk_size"] = int(self.chunk_size_entry.text())
             self.parent.config.settings["chunk_overlap"] = int(self.chunk_overlap_entry.text())
             self.parent.config.settings["retry_count"] = int(self.retry_entry.text())
+            self.parent.config.settings["generation_retries"] = max(0, int(self.generation_retry_entry.text()))
+            self.parent.config.settings["max_concurrent_chunks"] = max(1, int(self.concurrency_entry.text()))
             self.parent.config.settings["ollama_model"] = self.ollama_model_entry.text().strip()
+            hosts = [host.strip() for host in self.ollama_host_entry.text().split(",") if host.strip()]
+            self.parent.config.settings["ollama_host"] = hosts[0] if hosts else DEFAULT_OLLAMA_HOST
+            self.parent.config.settings["ollama_hosts"] = hosts if len(hosts) > 1 else []
+            self.parent.config.settings["keep_alive"] = self.keep_alive_entry.text().strip() or "30m"
             self.parent.config.settings["processing_prompt"] = self.processing_prompt_entry.toPlainText().strip()
+            self.parent.config.settings["stream_responses"] = self.stream_check.isChecked()
+            self.parent.config.settings["response_cache_enabled"] = self.response_cache_check.isChecked()
             self.parent.config.settings["output_format"] = self.output_format_combo.currentText()
             self.parent.config.settings["skip_manual_name"] = self.skip_name_check.isChecked()
             self.parent.config.settings["include_docx_title"] = self.include_title_check.isChecked()
+            self.parent.config.settings["merge_overlap"] = self.merge_overlap_check.isChecked()
             self.parent.config.settings["title_font_size"] = int(self.title_size_entry.text())
             self.parent.config.settings["custom_title"] = self.custom_title_entry.text().strip()
             self.parent.config.settings["typewriter_speed"] = int(self.speed_entry.text())
 
             self.parent.config.save_config()
+            # Starts loading the model if it (or the host) changed
+            self.parent.handler.warm_up()
             self.status_label.setText("Settings saved successfully.")
             self.status_label.setStyleSheet("color: #b5e0c8;")
             self.parent.config.clean_temp()
@@ -634,6 +904,61 @@ class SettingsScreen(QWidget):
         self.parent.show_screen("menu")
 
 
+class HistoryModel(QAbstractListModel):
+    PAGE_SIZE = 100
+    
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.entries = []
+        self.latest_id = None
+        self.has_more = True
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{entry['title']}\nURL: {entry['url']}\nDate: {entry['date']}"
+        if role == Qt.UserRole:
+            return entry["url"]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more
+    
+    def fetchMore(self, parent=QModelIndex()):
+        # Called by the view as the user scrolls towards the end
+        before_id = self.entries[-1]["rowid"] if self.entries else None
+        page = self.store.page(before_id, self.PAGE_SIZE)
+        self.has_more = len(page) == self.PAGE_SIZE
+        if not page:
+            return
+        if self.latest_id is None:
+            self.latest_id = page[0]["rowid"]
+        self.beginInsertRows(QModelIndex(), len(self.entries), len(self.entries) + len(page) - 1)
+        self.entries.extend(page)
+        self.endInsertRows()
+    
+    def refresh(self):
+        # Only rows added since the last refresh are fetched and inserted
+        if self.latest_id is None:
+            # Nothing loaded yet, e.g. history was empty when first shown:
+            # start over from the newest entry
+            self.has_more = True
+            self.fetchMore()
+            return
+        new_entries = self.store.since(self.latest_id)
+        if not new_entries:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(new_entries) - 1)
+        self.entries[0:0] = new_entries
+        self.endInsertRows()
+        self.latest_id = new_entries[0]["rowid"]
+
 class HistoryScreen(QWidget):
     def __init__(self, parent):
         super().__init__(parent)
@@ -653,52 +978,38 @@ class HistoryScreen(QWidget):
         back_btn.clicked.connect(lambda: self.parent.show_screen("menu"))
         layout.addWidget(back_btn, alignment=Qt.AlignLeft)
         
-        # History list
-        self.history_list = QListWidget()
+        # History list: rows are paged in from the history database as the
+        # view scrolls
+        self.history_model = HistoryModel(self.parent.config.history, self)
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
+        self.history_list.setUniformItemSizes(True)
         self.history_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #2e2e3f;
                 color: white;
                 border-radius: 5px;
                 padding: 10px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 border-bottom: 1px solid #3d3d5e;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5a5a8a;
             }
         """)
-        self.history_list.itemDoubleClicked.connect(self.load_history_item)
+        self.history_list.doubleClicked.connect(self.load_history_item)
         layout.addWidget(self.history_list)
         
         # Load history
         self.load_history()
     
     def load_history(self):
-        self.history_list.clear()
-        history = self.parent.config.load_history()
-        
-        # Ensure history is a list
-        if not isinstance(history, list):
-            history = []
-            
-        for entry in history:
-            # Skip if entry is not a dictionary
-            if not isinstance(entry, dict):
-                continue
-                
-            title = entry.get('title', '')
-            url = entry.get('url', '')
-            date = entry.get('date', '')
-            item_text = f"{title}\nURL: {url}\nDate: {date}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, url)
-            self.history_list.addItem(item)
-    
-    def load_history_item(self, item):
-        url = item.data(Qt.UserRole)
+        self.history_model.refresh()
+    
+    def load_history_item(self, index):
+        url = index.data(Qt.UserRole)
         self.parent.show_screen("start")
         self.parent.start_screen.url_entry.setText(url)
         self.parent.start_screen.on_submit()
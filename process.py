@@ -1,58 +1,241 @@
 # process.py
 
 from PySide6.QtCore import QThread, Signal
-import time
-from function import read_file_with_fallback
+import threading
+from function import read_file_with_fallback, CancelEvent, RetryNotice
+
+
+class TextBuffer:
+    # Worker and pool threads append output; the GUI drains it once per frame,
+    # so there is no per-token cross-thread signal.
+    def __init__(self):
+        self._parts = []
+        self._pending = ""
+        self._size = 0
+        self._retracted = 0
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        if not text:
+            return
+        with self._lock:
+            self._parts.append(text)
+            self._size += len(text)
+
+    def drain(self, max_chars=None):
+        with self._lock:
+            if not self._size:
+                return ""
+            data = self._pending + "".join(self._parts)
+            self._parts.clear()
+            if max_chars is not None and len(data) > max_chars:
+                self._pending = data[max_chars:]
+                data = data[:max_chars]
+            else:
+                self._pending = ""
+            self._size = len(self._pending)
+            return data
+
+    def retract(self, text):
+        # Takes back `text`, the last thing appended: what is still buffered
+        # is dropped, the rest the GUI removes from the end of its display
+        count = len(text)
+        with self._lock:
+            while count and (self._parts or self._pending):
+                if self._parts:
+                    part = self._parts.pop()
+                    kept = part[:-count] if count < len(part) else ""
+                    if kept:
+                        self._parts.append(kept)
+                else:
+                    part = self._pending
+                    kept = self._pending = part[:-count] if count < len(part) else ""
+                removed = len(part) - len(kept)
+                self._size -= removed
+                count -= removed
+            # Counted in UTF-16 units, as Qt text positions are
+            self._retracted += len(text[:count].encode("utf-16-le")) // 2
+
+    def take_retracted(self):
+        # Characters to delete from the end of the display
+        with self._lock:
+            count, self._retracted = self._retracted, 0
+            return count
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
 
 class ProcessingWorker(QThread):
     update_progress = Signal(int, int)  # current, total
-    update_text = Signal(str)
     update_status = Signal(str, str)  # message, color
+    update_metrics = Signal(str)  # tokens/sec and ETA
 
     def __init__(self, parent, video_url):
         super().__init__()
         self.parent = parent
         self.video_url = video_url
-        self.cancel = False
+        self.cancel_event = CancelEvent()
+        self.text_buffer = TextBuffer()
+        # Ordered display state shared with the pool threads while streaming
+        self._display_lock = threading.Lock()
+        self._next_idx = 0
+        self._total = 0
+        self._completed = 0
+        self._stream = True
+        self._job = None
+        self._done = set()
+        self._finished = {}
+        self._streamed = {}
+        self._buffers = {}
+
+    @property
+    def cancel(self):
+        return self.cancel_event.is_set()
+
+    def request_cancel(self):
+        self.cancel_event.set()
 
     def run(self):
         try:
             self.update_status.emit("Extracting transcript...", "white")
-            transcript_file, video_id, video_title = self.parent.handler.extract_and_save_transcript(self.video_url)
+            job = self.parent.handler.extract_transcript(self.video_url)
 
-            self.parent.processing_screen.video_id = video_id
-            self.parent.processing_screen.video_title = video_title
+            self.parent.processing_screen.job = job
+            self.parent.processing_screen.video_id = job.video_id
+            self.parent.processing_screen.video_title = job.video_title
 
             self.update_status.emit("Splitting transcript...", "white")
-            chunk_files = self.parent.handler.split_transcript(transcript_file)
-            total_chunks = len(chunk_files)
+            total_chunks = self.parent.handler.split_transcript(job)
 
-            for idx, chunk_file in enumerate(chunk_files):
-                if self.cancel:
-                    self.update_status.emit("Processing cancelled", "#ff7373")
-                    return
+            concurrency = self.parent.handler.chunk_concurrency()
+            self._stream = bool(self.parent.config.settings.get("stream_responses", True))
+            resumed = len(self.parent.handler.resume_job(job))
+            if resumed:
+                self.update_status.emit(
+                    f"Resuming: {resumed}/{total_chunks} chunks already done ({concurrency} at a time)...", "white"
+                )
+            else:
+                self.update_status.emit(f"Processing {total_chunks} chunks ({concurrency} at a time)...", "white")
+            self.update_progress.emit(0, total_chunks)
+            self._total = total_chunks
+            self._job = job
+            cache_before = self.parent.handler.response_cache.stats()
+            if self._stream and total_chunks:
+                self.text_buffer.append(self.chunk_header(0))
 
-                self.update_progress.emit(idx + 1, total_chunks)
-                self.update_text.emit(f"\n--- Chunk {idx+1} Response ---\n\n")
+            # Results arrive in completion order and are shown in chunk order
+            results = self.parent.handler.process_chunks(
+                job,
+                cancel_event=self.cancel_event,
+                on_token=self.chunk_token if self._stream else None,
+                on_result=self.chunk_result,
+            )
+            if self.cancel:
+                self.update_status.emit("Processing cancelled", "#ff7373")
+                return
 
-                generated_text = self.parent.handler.process_single_chunk(chunk_file)
-                speed = self.parent.config.settings.get("typewriter_speed", 2)
+            cache_after = self.parent.handler.response_cache.stats()
+            cached = cache_after["hits"] - cache_before["hits"]
+            failed = sum(1 for result in results if result is not None and not result.ok)
+            if failed:
+                self.update_status.emit(
+                    f"Processing complete: {failed}/{total_chunks} chunks failed and will be left out", "#ff7373"
+                )
+            elif cached:
+                self.update_status.emit(f"Processing complete ({cached}/{total_chunks} chunks from cache)", "#b5e0a8")
+            else:
+                self.update_status.emit("Processing complete", "#b5e0a8")
 
-                for char in generated_text:
-                    if self.cancel:
-                        break
-                    self.update_text.emit(char)
-                    time.sleep(speed / 1000.0)
+        except Exception as e:
+            self.update_status.emit(f"Error: {e}", "#ff7373")
 
-                if self.cancel:
-                    self.update_status.emit("Processing cancelled", "#ff7373")
-                    return
+    def report_metrics(self):
+        parts = []
+        tokens_per_second = self._job.metrics.tokens_per_second()
+        if tokens_per_second:
+            parts.append(f"{tokens_per_second:.1f} tok/s")
+        remaining = self._total - self._completed
+        eta = self._job.metrics.eta(remaining) if remaining else None
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            parts.append(f"ETA {minutes}m {seconds:02d}s" if minutes else f"ETA {seconds}s")
+        self.update_metrics.emit("  |  ".join(parts))
 
-            self.update_status.emit("Processing complete", "#b5e0a8")
+    def chunk_header(self, idx):
+        return f"\n--- Chunk {idx+1} Response ---\n\n"
 
-        except Exception as e:
-            self.update_status.emit(f"Error: {e}", "#ff7373")
+    def chunk_result(self, idx, result):
+        self._completed += 1
+        self.update_progress.emit(self._completed, self._total)
+        self.report_metrics()
+        if "prompt_eval_count" in result.metrics:
+            # Falls well below the chunk's size when Ollama reused the cached prefix
+            prompt_ms = result.metrics.get("prompt_eval_duration", 0) / 1e6
+            self.update_status.emit(
+                f"Chunk {idx+1}: {result.metrics['prompt_eval_count']} prompt tokens evaluated in {prompt_ms:.0f} ms",
+                "white",
+            )
+
+        if self._stream:
+            self.chunk_finished(idx, result)
+            return
+
+        self._finished[idx] = result.display_text
+        while self._next_idx in self._finished and not self.cancel:
+            self.show_chunk(self._next_idx, self._finished.pop(self._next_idx))
+            self._next_idx += 1
+
+    def chunk_token(self, idx, token):
+        # Called from pool threads: the chunk currently on screen is forwarded
+        # straight to the UI, later chunks wait in their buffer.
+        if self.cancel:
+            return
+        if isinstance(token, RetryNotice):
+            self.retry_chunk(idx, token)
+            return
+        with self._display_lock:
+            self._streamed.setdefault(idx, []).append(token)
+            if idx == self._next_idx:
+                self.text_buffer.append(token)
+            else:
+                self._buffers.setdefault(idx, []).append(token)
+
+    def retry_chunk(self, idx, notice):
+        # Drops the abandoned attempt's text so the view matches the result
+        with self._display_lock:
+            streamed = "".join(self._streamed.pop(idx, []))
+            if idx == self._next_idx:
+                self.text_buffer.retract(streamed)
+            else:
+                self._buffers.pop(idx, None)
+        self.update_status.emit(f"Chunk {idx+1}: {notice}", "#ff7373")
+
+    def chunk_finished(self, idx, result):
+        with self._display_lock:
+            streamed = "".join(self._streamed.pop(idx, [])).strip()
+            if not result.ok or not streamed:
+                # Failures and resumed chunks arrive as a result rather than tokens
+                tail = result.display_text if not streamed else f"\n{result.display_text}"
+                if idx == self._next_idx:
+                    self.text_buffer.append(tail)
+                else:
+                    self._buffers.setdefault(idx, []).append(tail)
+            self._done.add(idx)
+
+            while self._next_idx in self._done:
+                self._next_idx += 1
+                if self._next_idx < self._total:
+                    self.text_buffer.append(self.chunk_header(self._next_idx))
+                    buffered = "".join(self._buffers.pop(self._next_idx, []))
+                    if buffered:
+                        self.text_buffer.append(buffered)
+
+    def show_chunk(self, idx, generated_text):
+        self.text_buffer.append(self.chunk_header(idx))
+        self.text_buffer.append(generated_text)
 
 
-def combine_output(parent, video_id, video_title, status_callback):
-    parent.handler.combine_chunks_to_output(video_id, video_title, status_callback)
+def combine_output(parent, job, save_path, status_callback):
+    parent.handler.combine_chunks_to_output(job, save_path, status_callback)
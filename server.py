@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+T(YTTP)ER Job Server
+====================
+
+Runs the processing pipeline behind a small HTTP API, so several people
+can share one set of Ollama hosts instead of each GUI competing for them.
+
+Jobs wait in a single first-in, first-out queue. A few jobs run at once
+(--active-jobs), which lets the next video's transcript fetch and first
+chunks fill the gaps left by the tail of the current one, while one shared
+limit keeps the number of requests in flight at what the Ollama hosts
+accept (max_concurrent_chunks per host).
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8765] [--output-dir DIR] [--active-jobs 2]
+
+Endpoints:
+    POST   /jobs               {"url": ..., "prompt": ..., "model": ..., "format": "docx|txt"}
+    GET    /jobs               all jobs, oldest first
+    GET    /jobs/<id>          job status and progress
+    GET    /jobs/<id>/events   progress as NDJSON, one line per change, until the job ends
+    GET    /jobs/<id>/output   the finished document
+    DELETE /jobs/<id>          cancel a queued or running job
+    GET    /status             queue length and Ollama host load
+
+Only "url" is required; the other fields default to config.json. The API
+has no authentication: keep it on localhost or a trusted network.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from function import CancelEvent, Config, TranscriptHandler
+
+FORMATS = ("docx", "txt")
+FINISHED = ("done", "failed", "cancelled")
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain; charset=utf-8",
+}
+
+
+class ServerJob:
+    """One submitted URL and its progress through the pipeline."""
+
+    def __init__(self, url, video_id, model=None, prompt=None, output_format="docx"):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.video_id = video_id
+        self.model = model
+        self.prompt = prompt
+        self.output_format = output_format
+        self.status = "queued"
+        self.title = ""
+        self.chunk_count = 0
+        self.completed = 0
+        self.failed = 0
+        self.tokens_per_second = None
+        self.eta = None
+        self.error = None
+        self.output_path = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = CancelEvent()
+        # Bumped on every change; event streams wait for it to move
+        self.version = 0
+
+    @property
+    def finished_ok(self):
+        return self.status == "done" and self.output_path is not None
+
+    def snapshot(self, position=None):
+        snapshot = {
+            "id": self.id,
+            "url": self.url,
+            "video_id": self.video_id,
+            "title": self.title,
+            "model": self.model,
+            "format": self.output_format,
+            "status": self.status,
+            "chunks": self.chunk_count,
+            "completed": self.completed,
+            "failed": self.failed,
+            "created": round(self.created, 3),
+            "started": round(self.started, 3) if self.started else None,
+            "finished": round(self.finished, 3) if self.finished else None,
+        }
+        if position is not None:
+            snapshot["position"] = position
+        if self.tokens_per_second:
+            snapshot["tokens_per_second"] = round(self.tokens_per_second, 1)
+        if self.eta is not None and self.status == "generating":
+            snapshot["eta"] = round(self.eta, 1)
+        if self.error:
+            snapshot["error"] = self.error
+        if self.finished_ok:
+            snapshot["output"] = f"/jobs/{self.id}/output"
+        return snapshot
+
+
+class JobServer:
+    """Global job queue feeding one TranscriptHandler."""
+
+    def __init__(self, handler, output_dir, active_jobs=2):
+        self.handler = handler
+        self.output_dir = Path(output_dir)
+        self.active_jobs = max(1, active_jobs)
+        self.jobs = {}
+        self._queue = []
+        self._running = set()
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._threads = []
+        # Chunks of every running job draw on the same request slots, so
+        # running jobs side by side never overloads the Ollama hosts
+        self.handler.generation_slots = threading.BoundedSemaphore(handler.chunk_concurrency())
+
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(self.active_jobs):
+            thread = threading.Thread(target=self._runner, name=f"server-job-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        with self._changed:
+            self._stopping = True
+            running = [self.jobs[job_id] for job_id in self._running]
+            self._changed.notify_all()
+        for job in running:
+            job.cancel_event.set()
+
+    def submit(self, url, model=None, prompt=None, output_format=None):
+        # Raises ValueError for anything the client got wrong
+        video_id = self.handler.parse_video_id(url)
+        output_format = (output_format or self.handler.config.settings.get("output_format", "docx")).lower()
+        if output_format not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+        job = ServerJob(url, video_id, model or None, prompt or None, output_format)
+        with self._changed:
+            self.jobs[job.id] = job
+            self._queue.append(job.id)
+            self._changed.notify_all()
+        return job
+
+    def cancel(self, job_id):
+        with self._changed:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            if job_id in self._queue:
+                self._queue.remove(job_id)
+                self._update(job, status="cancelled", finished=time.time())
+                return job
+        job.cancel_event.set()
+        return job
+
+    def get(self, job_id):
+        with self._changed:
+            job = self.jobs.get(job_id)
+            return job.snapshot(self._position(job)) if job else None
+
+    def list(self):
+        with self._changed:
+            return [job.snapshot(self._position(job)) for job in self.jobs.values()]
+
+    def status(self):
+        with self._changed:
+            queued = len(self._queue)
+            running = len(self._running)
+        return {
+            "queued": queued,
+            "running": running,
+            "active_jobs": self.active_jobs,
+            "concurrency": self.handler.chunk_concurrency(),
+            "hosts": self.handler.host_pool().stats(),
+        }
+
+    def wait_for_change(self, job_id, version, timeout=15):
+        # Returns the next snapshot once the job moves past `version`, or the
+        # current one after `timeout` seconds so streams can send keep-alives
+        with self._changed:
+            job = self.jobs[job_id]
+            self._changed.wait_for(lambda: job.version != version or job.status in FINISHED, timeout)
+            return job.version, job.snapshot(self._position(job))
+
+    def _position(self, job):
+        return self._queue.index(job.id) + 1 if job.id in self._queue else None
+
+    def _update(self, job, **fields):
+        # Caller may or may not hold the lock; Condition's lock is re-entrant
+        with self._changed:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.version += 1
+            self._changed.notify_all()
+
+    def _next_job(self):
+        # Oldest queued job whose video isn't already running: two jobs for
+        # one video would share its checkpoint directory
+        def ready():
+            if self._stopping:
+                return True
+            running_videos = {self.jobs[job_id].video_id for job_id in self._running}
+            return any(self.jobs[job_id].video_id not in running_videos for job_id in self._queue)
+
+        with self._changed:
+            self._changed.wait_for(ready)
+            if self._stopping:
+                return None
+            running_videos = {self.jobs[job_id].video_id for job_id in self._running}
+            job_id = next(job_id for job_id in self._queue if self.jobs[job_id].video_id not in running_videos)
+            self._queue.remove(job_id)
+            self._running.add(job_id)
+            job = self.jobs[job_id]
+            self._update(job, status="fetching", started=time.time())
+            return job
+
+    def _runner(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._process(job)
+            except Exception as e:
+                self._update(job, status="failed", error=str(e), finished=time.time())
+            finally:
+                with self._changed:
+                    self._running.discard(job.id)
+                    self._changed.notify_all()
+
+    def _process(self, server_job):
+        job = self.handler.extract_transcript(server_job.url)
+        job.model = server_job.model
+        job.prompt = server_job.prompt
+        job.output_format = server_job.output_format
+        self._update(server_job, title=job.video_title)
+        chunk_count = self.handler.split_transcript(job)
+        self._update(server_job, status="generating", chunk_count=chunk_count)
+
+        def on_result(idx, result):
+            completed = server_job.completed + (1 if result.ok else 0)
+            failed = server_job.failed + (0 if result.ok or result.status == "cancelled" else 1)
+            self._update(
+                server_job,
+                completed=completed,
+                failed=failed,
+                tokens_per_second=job.metrics.tokens_per_second(),
+                eta=job.metrics.eta(chunk_count - completed - failed),
+            )
+
+        results = self.handler.process_chunks(job, server_job.cancel_event, on_result=on_result)
+        if server_job.cancel_event.is_set():
+            self._update(server_job, status="cancelled", finished=time.time())
+            return
+        if not any(result is not None and result.ok for result in results):
+            raise RuntimeError("Every chunk failed to generate.")
+
+        self._update(server_job, status="exporting")
+        save_path = self.output_dir / f"{job.video_id}-{server_job.id}.{server_job.output_format}"
+        self.handler.write_output(job, save_path)
+        if job.is_complete():
+            job.discard()
+        self._update(server_job, status="done", output_path=save_path, finished=time.time())
+
+
+def make_request_handler(server):
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} - {format % args}")
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, status, message):
+            self._send_json(status, {"error": message})
+
+        def _route(self):
+            # ("jobs", id, "events") style path parts
+            return tuple(part for part in urlparse(self.path).path.split("/") if part)
+
+        def do_GET(self):
+            parts = self._route()
+            if parts == ("status",):
+                self._send_json(200, server.status())
+            elif parts == ("jobs",):
+                self._send_json(200, {"jobs": server.list()})
+            elif len(parts) in (2, 3) and parts[0] == "jobs":
+                snapshot = server.get(parts[1])
+                if snapshot is None:
+                    self._send_error(404, "Unknown job")
+                elif len(parts) == 2:
+                    self._send_json(200, snapshot)
+                elif parts[2] == "events":
+                    self._stream_events(parts[1])
+                elif parts[2] == "output":
+                    self._send_output(parts[1])
+                else:
+                    self._send_error(404, "Not found")
+            else:
+                self._send_error(404, "Not found")
+
+        def do_POST(self):
+            if self._route() != ("jobs",):
+                self._send_error(404, "Not found")
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict) or not request.get("url"):
+                    raise ValueError('"url" is required')
+                for field in ("url", "model", "prompt", "format"):
+                    if not isinstance(request.get(field, ""), (str, type(None))):
+                        raise ValueError(f'"{field}" must be a string')
+                job = server.submit(
+                    request["url"],
+                    model=request.get("model"),
+                    prompt=request.get("prompt"),
+                    output_format=request.get("format"),
+                )
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            self._send_json(202, server.get(job.id), {"Location": f"/jobs/{job.id}"})
+
+        def do_DELETE(self):
+            parts = self._route()
+            if len(parts) != 2 or parts[0] != "jobs":
+                self._send_error(404, "Not found")
+                return
+            job = server.cancel(parts[1])
+            if job is None:
+                self._send_error(404, "Unknown job")
+            else:
+                self._send_json(200, server.get(job.id))
+
+        def _stream_events(self, job_id):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            version = None
+            try:
+                while True:
+                    new_version, snapshot = server.wait_for_change(job_id, version)
+                    # An unchanged snapshot after the timeout doubles as a keep-alive
+                    version = new_version
+                    data = (json.dumps(snapshot) + "\n").encode()
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    self.wfile.flush()
+                    if snapshot["status"] in FINISHED:
+                        break
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped listening; the job carries on
+                pass
+
+        def _send_output(self, job_id):
+            job = server.jobs[job_id]
+            if not job.finished_ok:
+                self._send_error(409, f"Job is {job.status}, no output yet")
+                return
+            try:
+                body = Path(job.output_path).read_bytes()
+            except OSError as e:
+                self._send_error(410, f"Output no longer available: {e}")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES[job.output_format])
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Content-Disposition", f'attachment; filename="{Path(job.output_path).name}"')
+            self.end_headers()
+            self.wfile.write(body)
+
+    return RequestHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the processing pipeline over a local HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output-dir", help="directory for finished documents (default: outputs/server)")
+    parser.add_argument("--active-jobs", type=int, default=2, help="jobs processed side by side")
+    args = parser.parse_args(argv)
+
+    config = Config()
+    handler = TranscriptHandler(config)
+    handler.warm_up()
+    server = JobServer(handler, args.output_dir or config.output_dir / "server", args.active_jobs)
+    server.start()
+
+    httpd = ThreadingHTTPServer((args.host, args.port), make_request_handler(server))
+    httpd.daemon_threads = True
+    print(f"T(YTTP)ER job server listening on http://{args.host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())